@@ -4,76 +4,432 @@ import numpy as np
 import time
 import os
 
+from numba import njit
+
 from utils.logger import time_logger
+from services.data import DataService, ResultStoreService
 from services.ema_service import EMAService
+from services.sweep_service import SweepService, SweepJob, Leaderboard
 
 from services.strategy_service import StrategyService
 from services.indicator_cache_service import IndicatorCacheService
+from services.indicator_service import IndicatorMatrix
+from services.signal_service import SignalService, SignalEvents
+
+
+# satu record metrics per kombinasi parameter (output kernel batch)
+METRICS_DTYPE = np.dtype(
+    [
+        ("ema_fast", np.int64),
+        ("ema_slow", np.int64),
+        ("total_trades", np.int64),
+        ("win_rate", np.float64),
+        ("avg_win", np.float64),
+        ("avg_loss", np.float64),
+        ("profit_factor", np.float64),
+        ("max_drawdown", np.float64),
+        ("final_equity", np.float64),
+        ("pnl_percent", np.float64),
+    ]
+)
+
+SUBSET_METRICS_DTYPE = np.dtype([("block", np.int64)] + METRICS_DTYPE.descr)
+
+# skenario biaya trading (fee dalam fraksi, mis. 0.001 = 0.1%)
+# - *_maker=True -> order limit: maker fee, tanpa slippage
+# - *_maker=False -> order market: taker fee + slippage
+# - slippage     : fraksi harga tetap per fill
+# - slippage_vol : kelipatan volatilitas bar (mis. ATR / close) per fill
+COST_DTYPE = np.dtype(
+    [
+        ("maker_fee", np.float64),
+        ("taker_fee", np.float64),
+        ("entry_maker", np.bool_),
+        ("exit_maker", np.bool_),
+        ("slippage", np.float64),
+        ("slippage_vol", np.float64),
+    ]
+)
+
+COST_METRICS_DTYPE = np.dtype(
+    METRICS_DTYPE.descr[:2] + [("scenario", np.int64)] + METRICS_DTYPE.descr[2:]
+)
+
+# statistik mark-to-market per bar (opsional, compute_pnl_batch mark_to_market=True)
+MTM_FIELDS = [
+    ("max_drawdown_bar", np.float64),  # drawdown equity per bar (termasuk posisi open)
+    ("underwater_pct", np.float64),  # % bar dengan equity < peak
+    ("max_underwater_bars", np.int64),  # periode underwater terpanjang (bar)
+    ("exposure_pct", np.float64),  # % bar dengan posisi terbuka
+]
+
+
+@njit(cache=True)
+def _trade_metrics_kernel(pnl_pct, pnl_nom, capital):
+    # single pass: win/loss stats + equity + drawdown sekaligus
+    n = pnl_pct.shape[0]
+    wins = 0
+    losses = 0
+    sum_win = 0.0
+    sum_loss = 0.0
+    gross_profit = 0.0
+    gross_loss = 0.0
+
+    # equity = capital + cumsum(pnl_nom), sama dengan kurva equity compute_pnl
+    cum = 0.0
+    equity = capital
+    peak = capital
+    max_dd = 0.0
+
+    for i in range(n):
+        p = pnl_pct[i]
+        if p > 0:
+            wins += 1
+            sum_win += p
+            gross_profit += pnl_nom[i]
+        elif p < 0:
+            losses += 1
+            sum_loss += p
+            gross_loss += pnl_nom[i]
+
+        cum += pnl_nom[i]
+        equity = capital + cum
+        if equity > peak:
+            peak = equity
+        dd = (peak - equity) / (peak if peak != 0 else 1.0) * 100
+        if dd > max_dd:
+            max_dd = dd
+
+    win_rate = wins / n * 100 if n > 0 else 0.0
+    avg_win = sum_win / wins if wins > 0 else np.nan
+    avg_loss = sum_loss / losses if losses > 0 else np.nan
+    gross_loss = abs(gross_loss)
+    profit_factor = gross_profit / gross_loss if gross_loss != 0 else np.inf
+    pnl_percent = (equity - capital) / capital * 100.0
+
+    return (
+        n,
+        win_rate,
+        avg_win,
+        avg_loss,
+        profit_factor,
+        max_dd,
+        equity,
+        pnl_percent,
+    )
+
+
+@njit(cache=True)
+def _segment_metrics_kernel(
+    close, ev, ev_buy, ev_sell, ev_lo, ev_hi, capital, entry_alloc, out
+):
+    # per segmen: state machine di event bar saja + metrics (out: n_seg x 8)
+    size = 1
+    for s in range(ev_lo.shape[0]):
+        size = max(size, (ev_hi[s] - ev_lo[s]) // 2 + 1)
+    pnl_pct = np.empty(size)
+    pnl_nom = np.empty(size)
+
+    for s in range(ev_lo.shape[0]):
+        n = 0
+        position = False
+        entry_price = 0.0
+
+        for k in range(ev_lo[s], ev_hi[s]):
+            # sama dengan loop compute_pnl lama: cek buy dulu, lalu sell
+            if ev_buy[k] and not position:
+                position = True
+                entry_price = close[ev[k]]
+                continue
+
+            if ev_sell[k] and position:
+                position = False
+                qty = entry_alloc / entry_price
+                pnl_nom[n] = qty * (close[ev[k]] - entry_price)
+                pnl_pct[n] = (pnl_nom[n] / entry_alloc) * 100
+                n += 1
+
+        (
+            out[s, 0],
+            out[s, 1],
+            out[s, 2],
+            out[s, 3],
+            out[s, 4],
+            out[s, 5],
+            out[s, 6],
+            out[s, 7],
+        ) = _trade_metrics_kernel(pnl_pct[:n], pnl_nom[:n], capital)
+
+
+@njit(cache=True)
+def _mtm_stats_kernel(close, entry_idx, exit_idx, entry_price, qty, entry_cost, pnl_nom, capital):
+    # equity per bar tanpa menyimpan kurva: realized + open PnL (mark di close)
+    n = close.shape[0]
+    m = entry_idx.shape[0]
+
+    realized = 0.0
+    peak = capital
+    max_dd = 0.0
+    underwater = 0
+    run = 0
+    max_run = 0
+    exposure = 0
+
+    k = 0
+    for t in range(n):
+        open_pnl = 0.0
+        if k < m and t >= entry_idx[k]:
+            if t < exit_idx[k]:
+                open_pnl = qty[k] * (close[t] - entry_price[k]) - entry_cost[k]
+                exposure += 1
+            else:
+                realized += pnl_nom[k]
+                k += 1
+
+        equity = capital + realized + open_pnl
+        if equity > peak:
+            peak = equity
+        dd = (peak - equity) / (peak if peak != 0 else 1.0) * 100
+        if dd > max_dd:
+            max_dd = dd
+
+        if equity < peak:
+            underwater += 1
+            run += 1
+            if run > max_run:
+                max_run = run
+        else:
+            run = 0
+
+    return (
+        max_dd,
+        underwater / n * 100 if n > 0 else 0.0,
+        max_run,
+        exposure / n * 100 if n > 0 else 0.0,
+    )
+
+
+class EquityCurve:
+    """
+    Equity mark-to-market per bar (long, posisi dibuka di close bar entry)
+    - stats() : statistik skalar via kernel (tanpa membentuk array kurva)
+    - equity / drawdown / position : dibentuk vectorized saat pertama diakses
+    Di bar exit equity = capital + cumsum(pnl_nom), sama dengan kurva per trade.
+    """
+
+    def __init__(
+        self,
+        close,
+        entry_idx,
+        exit_idx,
+        entry_price,
+        qty,
+        pnl_nom,
+        capital: float = 1000,
+        entry_cost=None,
+        index=None,
+    ):
+        self.close = np.asarray(close, dtype=float)
+        self.entry_idx = np.asarray(entry_idx, dtype=np.int64)
+        self.exit_idx = np.asarray(exit_idx, dtype=np.int64)
+        self.entry_price = np.asarray(entry_price, dtype=float)
+        self.qty = np.asarray(qty, dtype=float)
+        self.pnl_nom = np.asarray(pnl_nom, dtype=float)
+        self.capital = float(capital)
+        self.entry_cost = (
+            np.zeros(self.entry_idx.size)
+            if entry_cost is None
+            else np.asarray(entry_cost, dtype=float)
+        )
+        self.index = index
+
+        self._equity = None
+        self._position = None
+
+    def stats(self) -> dict:
+        max_dd, underwater_pct, max_underwater_bars, exposure_pct = _mtm_stats_kernel(
+            self.close,
+            self.entry_idx,
+            self.exit_idx,
+            self.entry_price,
+            self.qty,
+            self.entry_cost,
+            self.pnl_nom,
+            self.capital,
+        )
+        return {
+            "max_drawdown_bar": max_dd,
+            "underwater_pct": underwater_pct,
+            "max_underwater_bars": max_underwater_bars,
+            "exposure_pct": exposure_pct,
+        }
+
+    @property
+    def equity(self) -> np.ndarray:
+        if self._equity is None:
+            self._materialize()
+        return self._equity
+
+    @property
+    def position(self) -> np.ndarray:
+        if self._position is None:
+            self._materialize()
+        return self._position
+
+    @property
+    def drawdown(self) -> np.ndarray:
+        peak = np.maximum(np.maximum.accumulate(self.equity), self.capital)
+        return (peak - self.equity) / np.where(peak == 0, 1, peak) * 100
+
+    def to_series(self) -> pd.Series:
+        return pd.Series(self.equity, index=self.index, name="equity")
+
+    def _materialize(self):
+        n = self.close.shape[0]
+
+        # realized: pnl masuk di bar exit
+        pnl_at = np.zeros(n)
+        pnl_at[self.exit_idx] = self.pnl_nom
+        realized = np.cumsum(pnl_at)
+
+        # bar holding [entry, exit) per trade dari position mask
+        lengths = self.exit_idx - self.entry_idx
+        trade = np.repeat(np.arange(lengths.size), lengths)
+        offset = np.arange(trade.size) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        bars = self.entry_idx[trade] + offset
+
+        open_pnl = np.zeros(n)
+        open_pnl[bars] = (
+            self.qty[trade] * (self.close[bars] - self.entry_price[trade])
+            - self.entry_cost[trade]
+        )
+
+        self._position = np.zeros(n, dtype=bool)
+        self._position[bars] = True
+        self._equity = self.capital + realized + open_pnl
 
 
 class BacktestService:
 
+    @staticmethod
+    def pair_trades(buy, sell) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Position state machine tanpa loop per bar (sinyal dense / bool per bar)
+        - flat  + buy  -> entry
+        - long  + sell -> exit
+        - buy & sell di bar yang sama -> toggle (flat->long / long->flat),
+          sama seperti loop lama (cek buy dulu, lalu sell)
+        return: (entry_idx, exit_idx) int64, posisi terbuka di akhir dibuang
+        """
+
+        buy = np.asarray(buy, dtype=bool)
+        sell = np.asarray(sell, dtype=bool)
+
+        # hanya bar yang punya event
+        ev = np.flatnonzero(buy | sell)
+        return BacktestService.pair_events(ev, buy[ev], sell[ev])
+
+    @staticmethod
+    def pair_signals(signals: SignalEvents) -> tuple[np.ndarray, np.ndarray]:
+        # sama dengan pair_trades, langsung dari sinyal sparse (O(#sinyal))
+        return BacktestService.pair_events(*signals.events())
+
+    @staticmethod
+    def pair_events(ev, ev_buy, ev_sell) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Inti pair_trades: ev = index bar yang punya event (terurut),
+        ev_buy / ev_sell = flag per event
+        """
+        if ev.size == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+
+        toggle = ev_buy & ev_sell
+        is_reset = ~toggle  # buy saja -> long, sell saja -> flat
+
+        # state dari reset terakhir (atau flat di awal) ...
+        pos = np.arange(ev.size)
+        last_reset = np.maximum.accumulate(np.where(is_reset, pos, -1))
+        has_reset = last_reset >= 0
+        base = np.where(has_reset, ev_buy[np.maximum(last_reset, 0)], False)
+
+        # ... di-XOR dengan paritas toggle sejak reset tsb
+        toggles = np.cumsum(toggle)
+        toggles_at_reset = np.where(has_reset, toggles[np.maximum(last_reset, 0)], 0)
+        state = base ^ (((toggles - toggles_at_reset) & 1) == 1)
+
+        prev_state = np.empty_like(state)
+        prev_state[0] = False
+        prev_state[1:] = state[:-1]
+
+        exit_idx = ev[prev_state & ~state]
+        entry_idx = ev[~prev_state & state][: exit_idx.size]
+
+        return entry_idx, exit_idx
+
     @staticmethod
     def compute_pnl(
         arrays,
         capital: float = 1000,
         entry_alloc: float = 100,
+        metrics_only: bool = False,
+        empty_value: float = 0.0,
+        cost: dict | None = None,
+        volatility=None,
+        mark_to_market: bool = False,
     ):
-        # arrays: dict from ema_tuning_arrays
-        close = arrays["close"]
-        buy = arrays["buy"]
-        sell = arrays["sell"]
+        """
+        metrics_only=False -> (trades_df, equity_series, max_drawdown) seperti biasa
+        metrics_only=True  -> dict metrics saja (lihat trade_metrics), tanpa DataFrame
+        cost       : 1 skenario biaya (field COST_DTYPE), None = tanpa biaya
+        volatility : per bar, sejajar dengan arrays (untuk slippage_vol)
+        mark_to_market=True -> metrics + statistik equity per bar (MTM_FIELDS),
+                atau (trades_df, equity_series, max_drawdown, EquityCurve)
+                jika metrics_only=False (kurva per bar lazy, index open_time)
+        """
+        # arrays: dict from ema_tuning_arrays (atau DataFrame dengan kolom sama)
+        # sinyal: "signals" (SignalEvents, sparse) atau "buy" / "sell" (dense)
+        close = np.asarray(arrays["close"], dtype=float)
         open_time = arrays["open_time"]
 
-        n = close.shape[0]
-
-        # pre-allocate lists (faster than append of tuple)
-        entries = []
-        entry_prices = []
-        exits = []
-        exit_prices = []
-        pnl_pct = []
-        pnl_nom = []
-
-        position = False
-        entry_price = 0.0
-        entry_time = None
-
-        # local binding for speed
-        ea = entry_alloc
-        c_arr = close
-        b_arr = buy
-        s_arr = sell
-        t_arr = open_time
-
-        for i in range(n):
-            b = b_arr[i]
-            if b and (not position):
-                position = True
-                entry_price = float(c_arr[i])
-                entry_time = t_arr[i]
-                continue
+        if "signals" in arrays:
+            entry_idx, exit_idx = BacktestService.pair_signals(arrays["signals"])
+        else:
+            entry_idx, exit_idx = BacktestService.pair_trades(
+                arrays["buy"], arrays["sell"]
+            )
 
-            s = s_arr[i]
-            if s and position:
-                exit_price = float(c_arr[i])
-                exit_time = t_arr[i]
+        entry_price = close[entry_idx]
+        exit_price = close[exit_idx]
 
-                qty = ea / entry_price
-                pnl_n = qty * (exit_price - entry_price)  # nominal
-                pnl_p = (pnl_n / ea) * 100  # percent
+        cost = BacktestService.cost_scenarios(cost)[0] if cost is not None else None
+        pnl_nom, pnl_pct = BacktestService.trade_pnl(
+            close, entry_idx, exit_idx, entry_alloc, cost, volatility
+        )
 
-                entries.append(entry_time)
-                entry_prices.append(entry_price)
-                exits.append(exit_time)
-                exit_prices.append(exit_price)
-                pnl_pct.append(pnl_p)
-                pnl_nom.append(pnl_n)
+        curve = None
+        if mark_to_market:
+            curve = BacktestService.equity_curve(
+                close,
+                entry_idx,
+                exit_idx,
+                capital,
+                entry_alloc,
+                cost,
+                volatility,
+                index=None if metrics_only else open_time,
+            )
 
-                position = False
+        if metrics_only:
+            metrics = BacktestService.trade_metrics(
+                pnl_pct, pnl_nom, capital, empty_value=empty_value
+            )
+            if curve is not None:
+                metrics.update(curve.stats())
+            return metrics
 
         # build dataframe once (fast)
-        if len(entries) == 0:
+        if entry_idx.size == 0:
             trades_df = pd.DataFrame(
                 columns=[
                     "entry_time",
@@ -86,22 +442,31 @@ class BacktestService:
             )
             equity_series = pd.Series([capital])
             max_drawdown = 0.0
+            if curve is not None:
+                return trades_df, equity_series, max_drawdown, curve
             return trades_df, equity_series, max_drawdown
 
+        # Series (tz-aware) tetap Series agar dtype waktu tidak hilang
+        if hasattr(open_time, "iloc"):
+            entry_time = open_time.iloc[entry_idx].to_numpy()
+            exit_time = open_time.iloc[exit_idx].to_numpy()
+        else:
+            entry_time = open_time[entry_idx]
+            exit_time = open_time[exit_idx]
+
         trades_df = pd.DataFrame(
             {
-                "entry_time": entries,
-                "entry_price": entry_prices,
-                "exit_time": exits,
-                "exit_price": exit_prices,
+                "entry_time": entry_time,
+                "entry_price": entry_price,
+                "exit_time": exit_time,
+                "exit_price": exit_price,
                 "pnl_percent": pnl_pct,
                 "pnl_nominal": pnl_nom,
             }
         )
 
         # equity array (numpy) and drawdown (numpy)
-        pnl_nom_array = np.array(pnl_nom, dtype=float)
-        equity = np.concatenate(([capital], capital + np.cumsum(pnl_nom_array)))
+        equity = np.concatenate(([capital], capital + np.cumsum(pnl_nom)))
         equity_series = pd.Series(equity)
 
         cummax = np.maximum.accumulate(equity)
@@ -109,8 +474,424 @@ class BacktestService:
         dd = (cummax - equity) / np.where(cummax == 0, 1, cummax) * 100
         max_drawdown = float(np.max(dd)) if dd.size > 0 else 0.0
 
+        if curve is not None:
+            return trades_df, equity_series, max_drawdown, curve
         return trades_df, equity_series, max_drawdown
 
+    @staticmethod
+    def cost_scenarios(costs) -> np.ndarray:
+        """
+        dict / list dict / structured array -> array COST_DTYPE
+        field yang tidak diisi = 0 / False, mis.
+        [{"taker_fee": 0.001}, {"taker_fee": 0.001, "slippage": 0.0005}]
+        """
+        if isinstance(costs, np.ndarray) and costs.dtype == COST_DTYPE:
+            return costs
+        if isinstance(costs, dict):
+            costs = [costs]
+
+        out = np.zeros(len(costs), dtype=COST_DTYPE)
+        for i, cost in enumerate(costs):
+            for key, value in cost.items():
+                if key not in COST_DTYPE.names:
+                    raise ValueError(f"Parameter cost tidak dikenal: {key}")
+                out[key][i] = value
+        return out
+
+    @staticmethod
+    def trade_fills(
+        close: np.ndarray,
+        entry_idx: np.ndarray,
+        exit_idx: np.ndarray,
+        cost=None,
+        volatility=None,
+    ):
+        """
+        Harga fill & fee rate per trade long
+        cost=None -> fill di close tanpa fee
+        cost      -> fill = close -/+ slippage (taker saja), fee maker / taker
+        return: (entry_fill, exit_fill, entry_fee, exit_fee)
+        """
+        entry_price = close[entry_idx]
+        exit_price = close[exit_idx]
+
+        if cost is None:
+            return entry_price, exit_price, 0.0, 0.0
+
+        def slip(idx):
+            if cost["slippage_vol"] == 0:
+                return cost["slippage"]
+            if volatility is None:
+                raise ValueError("slippage_vol butuh array volatility")
+            # warmup indikator (NaN) -> tanpa komponen volatilitas
+            vol = np.nan_to_num(np.asarray(volatility, dtype=float)[idx])
+            return cost["slippage"] + cost["slippage_vol"] * vol
+
+        if cost["entry_maker"]:
+            entry_fill, entry_fee = entry_price, cost["maker_fee"]
+        else:
+            entry_fill, entry_fee = entry_price * (1 + slip(entry_idx)), cost["taker_fee"]
+
+        if cost["exit_maker"]:
+            exit_fill, exit_fee = exit_price, cost["maker_fee"]
+        else:
+            exit_fill, exit_fee = exit_price * (1 - slip(exit_idx)), cost["taker_fee"]
+
+        return entry_fill, exit_fill, entry_fee, exit_fee
+
+    @staticmethod
+    def trade_pnl(
+        close: np.ndarray,
+        entry_idx: np.ndarray,
+        exit_idx: np.ndarray,
+        entry_alloc: float,
+        cost=None,
+        volatility=None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        PnL per trade long (nominal, persen dari entry_alloc)
+        cost=None -> gross (perhitungan lama, hasil identik)
+        cost      -> fee dari notional (lihat trade_fills):
+                     pnl = qty * (exit_fill - entry_fill)
+                           - entry_alloc * entry_fee - qty * exit_fill * exit_fee
+        """
+        entry_fill, exit_fill, entry_fee, exit_fee = BacktestService.trade_fills(
+            close, entry_idx, exit_idx, cost, volatility
+        )
+
+        qty = entry_alloc / entry_fill
+        pnl_nom = qty * (exit_fill - entry_fill)  # nominal
+        if cost is not None:
+            pnl_nom = pnl_nom - entry_alloc * entry_fee - qty * exit_fill * exit_fee
+        return pnl_nom, (pnl_nom / entry_alloc) * 100  # percent
+
+    @staticmethod
+    def equity_curve(
+        close: np.ndarray,
+        entry_idx: np.ndarray,
+        exit_idx: np.ndarray,
+        capital: float = 1000,
+        entry_alloc: float = 100,
+        cost=None,
+        volatility=None,
+        index=None,
+    ) -> EquityCurve:
+        # kurva mark-to-market (lazy) untuk trade yang sudah di-pair
+        close = np.asarray(close, dtype=float)
+        entry_fill, _, entry_fee, _ = BacktestService.trade_fills(
+            close, entry_idx, exit_idx, cost, volatility
+        )
+        pnl_nom, _ = BacktestService.trade_pnl(
+            close, entry_idx, exit_idx, entry_alloc, cost, volatility
+        )
+        return EquityCurve(
+            close,
+            entry_idx,
+            exit_idx,
+            entry_fill,
+            entry_alloc / entry_fill,
+            pnl_nom,
+            capital,
+            entry_cost=entry_alloc * np.broadcast_to(entry_fee, entry_idx.shape),
+            index=index,
+        )
+
+    @staticmethod
+    def trade_metrics(pnl_pct, pnl_nom, capital: float, empty_value: float = 0.0):
+        """
+        Ringkasan trade dalam satu pass (tanpa pandas)
+        empty_value : nilai win_rate/avg_win/avg_loss/profit_factor jika 0 trade
+        avg_win / avg_loss = NaN jika tidak ada trade menang / kalah
+        """
+        (
+            total_trades,
+            win_rate,
+            avg_win,
+            avg_loss,
+            profit_factor,
+            max_drawdown,
+            final_equity,
+            pnl_percent,
+        ) = _trade_metrics_kernel(
+            np.asarray(pnl_pct, dtype=float),
+            np.asarray(pnl_nom, dtype=float),
+            float(capital),
+        )
+
+        if total_trades == 0:
+            win_rate = avg_win = avg_loss = profit_factor = empty_value
+
+        return {
+            "total_trades": total_trades,
+            "win_rate": win_rate,
+            "avg_win": avg_win,
+            "avg_loss": avg_loss,
+            "profit_factor": profit_factor,
+            "max_drawdown": max_drawdown,
+            "final_equity": final_equity,
+            "pnl_percent": pnl_percent,
+        }
+
+    @staticmethod
+    def round_metrics(metrics: dict) -> dict:
+        # pembulatan standar untuk output CSV (inf dibiarkan)
+        profit_factor = metrics["profit_factor"]
+        return {
+            "total_trades": metrics["total_trades"],
+            "win_rate": round(metrics["win_rate"], 2),
+            "avg_win": round(metrics["avg_win"], 6),
+            "avg_loss": round(metrics["avg_loss"], 6),
+            "profit_factor": (
+                round(profit_factor, 4)
+                if profit_factor != float("inf")
+                else float("inf")
+            ),
+            "max_drawdown": round(metrics["max_drawdown"], 4),
+            "final_equity": round(metrics["final_equity"], 4),
+            "pnl_percent": round(metrics["pnl_percent"], 4),
+        }
+
+    @staticmethod
+    def compute_pnl_batch(
+        close: np.ndarray,
+        ema,
+        pairs,
+        start: int = 0,
+        stop: int | None = None,
+        capital: float = 1000,
+        entry_alloc: float = 100,
+        costs=None,
+        volatility=None,
+        mark_to_market: bool = False,
+    ) -> np.ndarray:
+        """
+        Backtest EMA cross untuk banyak pasangan sekaligus (tanpa DataFrame per pair)
+        close : close full dataset
+        ema   : IndicatorMatrix / dict period -> EMA full dataset
+        pairs : [(ema_fast, ema_slow), ...]
+        [start, stop) : window bar yang dites (mis. DataService.get_bounds("train"))
+        costs : skenario biaya (lihat cost_scenarios), sinyal & trade per pair
+                dihitung sekali lalu dinilai untuk semua skenario
+        volatility : per bar full dataset (untuk slippage_vol), NaN -> 0
+        mark_to_market : tambah kolom MTM_FIELDS (equity per bar via kernel,
+                kurva tidak dibentuk)
+        return: structured array METRICS_DTYPE, satu baris per pair (urutan sama)
+                atau COST_METRICS_DTYPE (pair x skenario) jika costs diisi
+        """
+
+        close = np.asarray(close, dtype=float)[start:stop]
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+
+        if costs is None:
+            scenarios = [None]
+            dtype = METRICS_DTYPE
+        else:
+            scenarios = BacktestService.cost_scenarios(costs)
+            dtype = COST_METRICS_DTYPE
+        if mark_to_market:
+            dtype = np.dtype(dtype.descr + MTM_FIELDS)
+        if volatility is not None:
+            volatility = np.asarray(volatility, dtype=float)[start:stop]
+
+        # view EMA per period di window (shared antar pair, tanpa copy)
+        rows = {int(p): ema[p][start:stop] for p in np.unique(pairs)}
+
+        n_sc = len(scenarios)
+        out = np.zeros(pairs.shape[0] * n_sc, dtype=dtype)
+        out["ema_fast"] = np.repeat(pairs[:, 0], n_sc)
+        out["ema_slow"] = np.repeat(pairs[:, 1], n_sc)
+        if costs is not None:
+            out["scenario"] = np.tile(np.arange(n_sc), pairs.shape[0])
+        out["final_equity"] = capital
+
+        for j, (fast, slow) in enumerate(pairs):
+            signals = SignalService.cross_events(rows[fast], rows[slow])
+            entry_idx, exit_idx = BacktestService.pair_signals(signals)
+            if entry_idx.size == 0:
+                continue
+
+            for k, cost in enumerate(scenarios):
+                mtm = ()
+                if mark_to_market:
+                    curve = BacktestService.equity_curve(
+                        close, entry_idx, exit_idx, capital, entry_alloc, cost, volatility
+                    )
+                    pnl_nom = curve.pnl_nom
+                    pnl_pct = (pnl_nom / entry_alloc) * 100
+                    mtm = tuple(curve.stats().values())
+                else:
+                    pnl_nom, pnl_pct = BacktestService.trade_pnl(
+                        close, entry_idx, exit_idx, entry_alloc, cost, volatility
+                    )
+
+                key = (fast, slow) if cost is None else (fast, slow, k)
+                out[j * n_sc + k] = (
+                    key + _trade_metrics_kernel(pnl_pct, pnl_nom, capital) + mtm
+                )
+
+        return out
+
+    @staticmethod
+    def compute_pnl_blocks(
+        close: np.ndarray,
+        ema,
+        pairs,
+        blocks,
+        capital: float = 1000,
+        entry_alloc: float = 100,
+    ) -> np.ndarray:
+        """
+        compute_pnl_batch untuk window berupa beberapa block [lo, hi) terpisah
+        (mis. sampel tersebar di seluruh train, bukan prefix)
+        Tiap block = window sendiri (bar pertama tidak sinyal, posisi terbuka di
+        akhir block dibuang), trade semua block digabung urut waktu -> 1 baris
+        metrics per pair. Kerja sebanding total panjang block.
+        1 block (start, stop) -> hasil identik dengan compute_pnl_batch
+        return: METRICS_DTYPE, urutan sama dengan pairs
+        """
+
+        close = np.asarray(close, dtype=float)
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        blocks = np.asarray(blocks, dtype=np.int64).reshape(-1, 2)
+
+        out = np.zeros(pairs.shape[0], dtype=METRICS_DTYPE)
+        out["ema_fast"] = pairs[:, 0]
+        out["ema_slow"] = pairs[:, 1]
+        out["final_equity"] = capital
+
+        for j, (fast, slow) in enumerate(pairs):
+            entries, exits = [], []
+            for lo, hi in blocks:
+                signals = SignalService.cross_events(ema[fast][lo:hi], ema[slow][lo:hi])
+                entry_idx, exit_idx = BacktestService.pair_signals(signals)
+                entries.append(entry_idx + lo)
+                exits.append(exit_idx + lo)
+
+            entry_idx = np.concatenate(entries)
+            exit_idx = np.concatenate(exits)
+            if entry_idx.size == 0:
+                continue
+
+            pnl_nom, pnl_pct = BacktestService.trade_pnl(
+                close, entry_idx, exit_idx, entry_alloc
+            )
+            out[j] = (fast, slow) + _trade_metrics_kernel(pnl_pct, pnl_nom, capital)
+
+        return out
+
+    @staticmethod
+    def ema_blocks_kernel(inputs: dict, pairs: np.ndarray, **params) -> np.ndarray:
+        """
+        Kernel SweepService untuk compute_pnl_blocks: inputs = {"close", "ema",
+        "ema_periods"}, params = blocks, capital, entry_alloc
+        """
+        ema = IndicatorMatrix(inputs["ema_periods"], inputs["ema"])
+        return BacktestService.compute_pnl_blocks(inputs["close"], ema, pairs, **params)
+
+    @staticmethod
+    def ema_pair_kernel(inputs: dict, pairs: np.ndarray, **params) -> np.ndarray:
+        """
+        Kernel untuk SweepService: inputs = {"close", "ema", "ema_periods"}
+        (+ "volatility" opsional), params = argumen compute_pnl_batch
+        (start, stop, capital, entry_alloc, costs)
+        """
+        ema = IndicatorMatrix(inputs["ema_periods"], inputs["ema"])
+        return BacktestService.compute_pnl_batch(
+            inputs["close"], ema, pairs, volatility=inputs.get("volatility"), **params
+        )
+
+    @staticmethod
+    def compute_pnl_segments(
+        close: np.ndarray,
+        ema,
+        pairs,
+        segments,
+        capital: float = 1000,
+        entry_alloc: float = 100,
+        empty_value: float = np.nan,
+    ) -> np.ndarray:
+        """
+        Backtest EMA cross untuk semua segmen (regime block) x pair dalam satu batch
+        segments : [(block, lo, hi), ...] index bar [lo, hi) (EMAService.segment_bounds)
+        Sinyal & event per pair dihitung sekali di full data, tiap segmen cukup
+        slice event via searchsorted. Bar pertama segmen tidak pernah sinyal
+        (sama dengan ema_tuning_subset yang slice dulu baru cross).
+        return: SUBSET_METRICS_DTYPE, urutan segmen lalu pair
+        """
+
+        close = np.asarray(close, dtype=float)
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        segments = np.asarray(segments, dtype=np.int64).reshape(-1, 3)
+        n_seg, n_pair = segments.shape[0], pairs.shape[0]
+
+        out = np.zeros(n_seg * n_pair, dtype=SUBSET_METRICS_DTYPE)
+        out["block"] = np.repeat(segments[:, 0], n_pair)
+        out["ema_fast"] = np.tile(pairs[:, 0], n_seg)
+        out["ema_slow"] = np.tile(pairs[:, 1], n_seg)
+
+        stats = np.empty((n_seg, 8))
+        fields = SUBSET_METRICS_DTYPE.names[3:]
+
+        for j, (fast, slow) in enumerate(pairs):
+            ev, ev_buy, ev_sell = SignalService.cross_events(
+                ema[fast], ema[slow]
+            ).events()
+
+            ev_lo = np.searchsorted(ev, segments[:, 1] + 1, side="left")
+            ev_hi = np.searchsorted(ev, segments[:, 2], side="left")
+
+            _segment_metrics_kernel(
+                close,
+                ev,
+                ev_buy,
+                ev_sell,
+                ev_lo,
+                ev_hi,
+                float(capital),
+                float(entry_alloc),
+                stats,
+            )
+
+            rows = out[j::n_pair]  # view, tulis langsung ke out
+            for m, field in enumerate(fields):
+                rows[field] = stats[:, m]
+
+            # 0 trade -> empty_value (sama dengan trade_metrics)
+            empty = stats[:, 0] == 0
+            for field in ("win_rate", "avg_win", "avg_loss", "profit_factor"):
+                rows[field][empty] = empty_value
+
+        return out
+
+    @staticmethod
+    def segment_kernel(inputs: dict, segments: np.ndarray, **params) -> np.ndarray:
+        """
+        Kernel SweepService untuk regime block: grid = segments [(block, lo, hi)]
+        inputs = {"close", "ema", "ema_periods"}, params = pairs, capital, entry_alloc
+        """
+        ema = IndicatorMatrix(inputs["ema_periods"], inputs["ema"])
+        return BacktestService.compute_pnl_segments(
+            inputs["close"], ema, segments=segments, **params
+        )
+
+    @staticmethod
+    def metrics_frame(metrics: np.ndarray) -> pd.DataFrame:
+        # structured array -> DataFrame dengan pembulatan standar CSV
+        return pd.DataFrame(metrics).round(
+            {
+                "win_rate": 2,
+                "avg_win": 6,
+                "avg_loss": 6,
+                "profit_factor": 4,
+                "max_drawdown": 4,
+                "final_equity": 4,
+                "pnl_percent": 4,
+                "max_drawdown_bar": 4,
+                "underwater_pct": 2,
+                "exposure_pct": 2,
+            }
+        )
+
     @staticmethod
     def test_strategy():
         capital = 1000
@@ -118,29 +899,14 @@ class BacktestService:
 
         df = StrategyService.ema_baseline_subset()
 
-        results, equity_series, max_drawdown = BacktestService.compute_pnl(
-            df, capital, entry_alloc
+        metrics = BacktestService.compute_pnl(
+            df, capital, entry_alloc, metrics_only=True, empty_value=np.nan
         )
 
-        # Statistik dasar
-        total_trades = len(results)
-
         # Hitung jumlah sinyal buy dan sell
         total_buy = df["buy"].sum()
         total_sell = df["sell"].sum()
 
-        win_rate = (results["pnl_percent"] > 0).mean() * 100
-        avg_win = results[results["pnl_percent"] > 0]["pnl_percent"].mean()
-        avg_loss = results[results["pnl_percent"] < 0]["pnl_percent"].mean()
-
-        # Profit Factor
-        gross_profit = results[results["pnl_percent"] > 0]["pnl_nominal"].sum()
-        gross_loss = abs(results[results["pnl_percent"] < 0]["pnl_nominal"].sum())
-        profit_factor = gross_profit / gross_loss if gross_loss != 0 else float("inf")
-
-        final_equity = equity_series.iloc[-1]
-        pnl = (final_equity - capital) / capital * 100
-
         print("\n=== SIGNAL SUMMARY ===")
         print(f"Total Buy Signals  : {total_buy}")
         print(f"Total Sell Signals : {total_sell}")
@@ -149,123 +915,142 @@ class BacktestService:
         print("\n=== BACKTEST SUMMARY ===")
         print(f"Total Capital      : {capital} USDT")
         print(f"Entry Allocation   : {entry_alloc} USDT per trade")
-        print(f"Total Trades       : {total_trades}")
-        print(f"Win Rate           : {win_rate:.2f}%")
-        print(f"Avg Win (%)        : {avg_win:.2f}%")
-        print(f"Avg Loss (%)       : {avg_loss:.2f}%")
-        print(f"Profit Factor      : {profit_factor:.2f}")
-        print(f"Max Drawdown       : {max_drawdown:.2f}%")
-        print(f"Final Equity       : {final_equity:.2f} USDT")
-        print(f"Total PnL (%)      : {pnl:.2f}%")
+        print(f"Total Trades       : {metrics['total_trades']}")
+        print(f"Win Rate           : {metrics['win_rate']:.2f}%")
+        print(f"Avg Win (%)        : {metrics['avg_win']:.2f}%")
+        print(f"Avg Loss (%)       : {metrics['avg_loss']:.2f}%")
+        print(f"Profit Factor      : {metrics['profit_factor']:.2f}")
+        print(f"Max Drawdown       : {metrics['max_drawdown']:.2f}%")
+        print(f"Final Equity       : {metrics['final_equity']:.2f} USDT")
+        print(f"Total PnL (%)      : {metrics['pnl_percent']:.2f}%")
 
     @staticmethod
-    def test_tuning():
-        csv_file = "ema_tuning_results_1h_60.csv"
-        # header create if not exists
-        columns = [
-            "ema_fast",
-            "ema_slow",
-            "total_trades",
-            "win_rate",
-            "avg_win",
-            "avg_loss",
-            "profit_factor",
-            "max_drawdown",
-            "final_equity",
-            "pnl_percent",
-        ]
-        if not os.path.exists(csv_file):
-            pd.DataFrame(columns=columns).to_csv(csv_file, index=False)
+    def test_tuning(
+        workers: int | None = None,
+        reset: bool = False,
+        costs: list | None = None,
+        mark_to_market: bool = False,
+    ):
+        # costs: list skenario biaya (dict field COST_DTYPE), 1 baris per pair x skenario
+        # mark_to_market: tambah drawdown per bar, time under water, exposure
+        suffix = ("_costs" if costs is not None else "") + (
+            "_mtm" if mark_to_market else ""
+        )
+        name = f"ema_tuning_1h_60{suffix}"
+        csv_file = f"ema_tuning_results_1h_60{suffix}.csv"
 
         capital = 1000.0
         entry_alloc = capital * 0.1
 
-        rows_buffer = []
-        flush_every = 200  # tulis ke CSV tiap 200 kombinasi (tune sesuai)
-        comb_count = 0
         total_start = time.perf_counter()
 
-        for ema_fast in range(1, 100):
-            for ema_slow in range(ema_fast + 1, 101):
-                comb_count += 1
+        # grid dibagi per chunk ke process pool, input via shared memory
+        pairs, inputs, params = BacktestService._tuning_sweep(capital, entry_alloc)
+        if mark_to_market:
+            params["mark_to_market"] = True
+        if costs is not None:
+            # list dict / COST_DTYPE -> list dict lengkap (params masuk manifest json)
+            costs = BacktestService.cost_scenarios(costs)
+            params["costs"] = [dict(zip(COST_DTYPE.names, c.tolist())) for c in costs]
+            if (costs["slippage_vol"] != 0).any():
+                inputs["volatility"] = EMAService.get_volatility()
+
+        # checkpoint per chunk, restart melanjutkan chunk yang belum selesai
+        job = SweepJob(name, pairs, inputs, params, reset=reset)
+        metrics = SweepService.run_job(
+            job, BacktestService.ema_pair_kernel, inputs, workers=workers
+        )
+        job.write_csv(csv_file, BacktestService.metrics_frame)
 
-                arrays = EMAService.ema_tuning(ema_fast=ema_fast, ema_slow=ema_slow)
+        # salinan columnar untuk seleksi lanjutan (tanpa parse CSV)
+        ResultStoreService(name, reset=True).append(metrics)
 
-                results, equity_series, max_drawdown = BacktestService.compute_pnl(
-                    arrays, capital=capital, entry_alloc=entry_alloc
-                )
+        total_elapsed = time.perf_counter() - total_start
+        print(f"\nFINISHED {len(pairs)} combos in {total_elapsed:.2f} sec")
 
-                total_trades = len(results)
+    @staticmethod
+    def test_tuning_top(
+        k: int = 5,
+        min_trades: int = 30,
+        max_drawdown: float | None = None,
+        full_table: bool = False,
+        workers: int | None = None,
+    ):
+        """
+        Seleksi awal (planning.md 4.3) langsung saat sweep: top-k PF, PnL%, DD
+        dengan filter trade minimal / drawdown maksimal, tanpa menyimpan semua
+        baris. full_table=True -> tabel penuh tetap ditulis ke result store.
+        """
+        print("\nUSE EMA TUNING TOP-K")
+        csv_file = "ema_tuning_top_1h_60.csv"
 
-                if total_trades == 0:
-                    win_rate = 0.0
-                    avg_win = 0.0
-                    avg_loss = 0.0
-                    profit_factor = 0.0
-                else:
-                    pnl_pct_series = results["pnl_percent"]
-                    win_rate = float((pnl_pct_series > 0).mean() * 100)
-                    avg_win = float(pnl_pct_series[pnl_pct_series > 0].mean() or 0.0)
-                    avg_loss = float(pnl_pct_series[pnl_pct_series < 0].mean() or 0.0)
-                    gross_profit = float(
-                        results.loc[results["pnl_percent"] > 0, "pnl_nominal"].sum()
-                    )
-                    gross_loss = abs(
-                        float(
-                            results.loc[results["pnl_percent"] < 0, "pnl_nominal"].sum()
-                        )
-                    )
-                    profit_factor = (
-                        float(gross_profit / gross_loss)
-                        if gross_loss != 0
-                        else float("inf")
-                    )
+        capital = 1000.0
+        entry_alloc = capital * 0.1
 
-                final_equity = float(equity_series.iloc[-1])
-                pnl_percent = (final_equity - capital) / capital * 100.0
-
-                row = {
-                    "ema_fast": ema_fast,
-                    "ema_slow": ema_slow,
-                    "total_trades": total_trades,
-                    "win_rate": round(win_rate, 2),
-                    "avg_win": round(avg_win, 6),
-                    "avg_loss": round(avg_loss, 6),
-                    "profit_factor": (
-                        round(profit_factor, 4)
-                        if profit_factor != float("inf")
-                        else float("inf")
-                    ),
-                    "max_drawdown": round(max_drawdown, 4),
-                    "final_equity": round(final_equity, 4),
-                    "pnl_percent": round(pnl_percent, 4),
-                }
-
-                rows_buffer.append(row)
-
-                # flush buffer periodically to CSV (faster than per-iteration write)
-                if len(rows_buffer) >= flush_every:
-                    pd.DataFrame(rows_buffer).to_csv(
-                        csv_file, mode="a", index=False, header=False
-                    )
-                    rows_buffer = []
+        total_start = time.perf_counter()
 
-                # optional light progress print every N combos
-                if comb_count % 500 == 0:
-                    elapsed_total = time.perf_counter() - total_start
-                    print(f" [{comb_count}] combos done — elapsed {elapsed_total:.1f}s")
+        pairs, inputs, params = BacktestService._tuning_sweep(capital, entry_alloc)
+        leaderboard = Leaderboard(
+            {"profit_factor": "max", "pnl_percent": "max", "max_drawdown": "min"},
+            k=k,
+            filters={
+                "total_trades": (min_trades, None),
+                "max_drawdown": (None, max_drawdown),
+            },
+        )
+        store = ResultStoreService("ema_tuning_1h_60", reset=True) if full_table else None
+
+        SweepService.run_top(
+            BacktestService.ema_pair_kernel,
+            inputs,
+            pairs,
+            leaderboard,
+            params,
+            workers=workers,
+            store=store,
+        )
 
-        # final flush
-        if rows_buffer:
-            pd.DataFrame(rows_buffer).to_csv(
-                csv_file, mode="a", index=False, header=False
-            )
+        table = leaderboard.table()
+        result_df = (
+            BacktestService.metrics_frame(table) if table is not None else pd.DataFrame()
+        )
+        result_df.to_csv(csv_file, index=False)
 
         total_elapsed = time.perf_counter() - total_start
-        print(f"\nFINISHED {comb_count} combos in {total_elapsed:.2f} sec")
+        print(result_df)
+        print(
+            f"\nFINISHED {leaderboard.n_seen} combos "
+            f"({leaderboard.n_eligible} eligible) in {total_elapsed:.2f} sec"
+        )
+
+        return leaderboard
 
     @staticmethod
-    def test_tuning_subset():
+    def _tuning_sweep(capital: float, entry_alloc: float):
+        # grid semua pair EMA 1..100 di window train -> (pairs, inputs, params)
+        matrix = EMAService.preload_ema(range(1, 101))
+        start, stop = DataService.get_bounds("train")
+        pairs = [
+            (ema_fast, ema_slow)
+            for ema_fast in range(1, 100)
+            for ema_slow in range(ema_fast + 1, 101)
+        ]
+
+        inputs = {
+            "close": EMAService.get_close(),
+            "ema": matrix.values,
+            "ema_periods": matrix.periods,
+        }
+        params = {
+            "start": start,
+            "stop": stop,
+            "capital": capital,
+            "entry_alloc": entry_alloc,
+        }
+        return pairs, inputs, params
+
+    @staticmethod
+    def test_tuning_subset(reset: bool = False):
         print("\nUSE EMA TUNING SUBSET")
         csv_file = "ema_tuning_subset_results_60.csv"
 
@@ -289,122 +1074,50 @@ class BacktestService:
             for _, row in regime_df.iterrows()
         ]
 
-        # header create if not exists
-        columns = [
-            "note",
-            "start_date",
-            "end_date",
-            "ema_fast",
-            "ema_slow",
-            "total_trades",
-            "win_rate",
-            "avg_win",
-            "avg_loss",
-            "profit_factor",
-            "max_drawdown",
-            "final_equity",
-            "pnl_percent",
-        ]
-
-        if not os.path.exists(csv_file):
-            pd.DataFrame(columns=columns).to_csv(csv_file, index=False)
-
         capital = 1000.0
         entry_alloc = capital * 0.1
 
-        rows_buffer = []
-        flush_every = 1
-
-        for subset in data_subsets:
-            start_date = subset["start_date"]
-            end_date = subset["end_date"]
-            note = subset["note"]
-
-            for combo in top_ema_combos:
-                ema_fast = combo["ema_fast"]
-                ema_slow = combo["ema_slow"]
-
-                arrays = EMAService.ema_tuning_subset(
-                    ema_fast=ema_fast,
-                    ema_slow=ema_slow,
-                    start_date=start_date,
-                    end_date=end_date,
-                )
-
-                # ✅ HARD GUARD
-                if arrays is None:
-                    print("SKIPPED: arrays None (block too small)")
-                    continue
-
-                results, equity_series, max_drawdown = BacktestService.compute_pnl(
-                    arrays,
-                    capital=capital,
-                    entry_alloc=entry_alloc,
-                )
-
-                total_trades = len(results)
-
-                if total_trades == 0:
-                    win_rate = np.nan
-                    avg_win = np.nan
-                    avg_loss = np.nan
-                    profit_factor = np.nan
-                else:
-                    pnl_pct_series = results["pnl_percent"]
-                    win_rate = float((pnl_pct_series > 0).mean() * 100)
-                    avg_win = float(pnl_pct_series[pnl_pct_series > 0].mean() or 0.0)
-                    avg_loss = float(pnl_pct_series[pnl_pct_series < 0].mean() or 0.0)
-                    gross_profit = float(
-                        results.loc[results["pnl_percent"] > 0, "pnl_nominal"].sum()
-                    )
-                    gross_loss = abs(
-                        float(
-                            results.loc[results["pnl_percent"] < 0, "pnl_nominal"].sum()
-                        )
-                    )
-                    profit_factor = (
-                        float(gross_profit / gross_loss)
-                        if gross_loss != 0
-                        else float("inf")
-                    )
+        # batas block -> index bar (binary search sekali untuk semua block)
+        lo, hi, valid = EMAService.segment_bounds(
+            [d["start_date"] for d in data_subsets],
+            [d["end_date"] for d in data_subsets],
+        )
+        if (~valid).any():
+            print(f"SKIPPED: {int((~valid).sum())} block too small")
+
+        blocks = np.flatnonzero(valid)
+        segments = np.column_stack([blocks, lo[blocks], hi[blocks]])
+        pairs = [[c["ema_fast"], c["ema_slow"]] for c in top_ema_combos]
+
+        matrix = EMAService.preload_ema(np.unique(pairs))
+        inputs = {
+            "close": EMAService.get_close(),
+            "ema": matrix.values,
+            "ema_periods": matrix.periods,
+        }
+        params = {"pairs": pairs, "capital": capital, "entry_alloc": entry_alloc}
 
-                final_equity = float(equity_series.iloc[-1])
-                pnl_percent = (final_equity - capital) / capital * 100.0
-
-                row = {
-                    "note": note,
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "ema_fast": ema_fast,
-                    "ema_slow": ema_slow,
-                    "total_trades": total_trades,
-                    "win_rate": round(win_rate, 2),
-                    "avg_win": round(avg_win, 6),
-                    "avg_loss": round(avg_loss, 6),
-                    "profit_factor": (
-                        round(profit_factor, 4)
-                        if profit_factor != float("inf")
-                        else float("inf")
-                    ),
-                    "max_drawdown": round(max_drawdown, 4),
-                    "final_equity": round(final_equity, 4),
-                    "pnl_percent": round(pnl_percent, 4),
-                }
-
-                rows_buffer.append(row)
-
-                # flush buffer periodically to CSV (faster than per-iteration write)
-                if len(rows_buffer) >= flush_every:
-                    pd.DataFrame(rows_buffer).to_csv(
-                        csv_file, mode="a", index=False, header=False
-                    )
-                    rows_buffer = []
+        job = SweepJob(
+            "ema_tuning_subset_60", segments, inputs, params, chunk_size=512, reset=reset
+        )
+        metrics = SweepService.run_job(
+            job, BacktestService.segment_kernel, inputs, workers=1
+        )
 
-        # final flush
-        if rows_buffer:
-            pd.DataFrame(rows_buffer).to_csv(
-                csv_file, mode="a", index=False, header=False
+        def to_frame(metrics):
+            result_df = BacktestService.metrics_frame(metrics)
+            blocks = result_df.pop("block")
+            result_df.insert(0, "note", [data_subsets[b]["note"] for b in blocks])
+            result_df.insert(
+                1, "start_date", [data_subsets[b]["start_date"] for b in blocks]
+            )
+            result_df.insert(
+                2, "end_date", [data_subsets[b]["end_date"] for b in blocks]
             )
+            return result_df
+
+        job.write_csv(csv_file, to_frame)
+        ResultStoreService("ema_tuning_subset_60", reset=True).append(metrics)
 
     @staticmethod
     def test_candlestick():
@@ -468,50 +1181,15 @@ class BacktestService:
             ].tail(50)
         )
 
-        results, equity_series, max_drawdown = BacktestService.compute_pnl(
+        metrics = BacktestService.compute_pnl(
             arrays,
             capital=capital,
             entry_alloc=entry_alloc,
+            metrics_only=True,
+            empty_value=np.nan,
         )
 
-        total_trades = len(results)
-
-        if total_trades == 0:
-            win_rate = np.nan
-            avg_win = np.nan
-            avg_loss = np.nan
-            profit_factor = np.nan
-        else:
-            pnl_pct_series = results["pnl_percent"]
-            win_rate = float((pnl_pct_series > 0).mean() * 100)
-            avg_win = float(pnl_pct_series[pnl_pct_series > 0].mean() or 0.0)
-            avg_loss = float(pnl_pct_series[pnl_pct_series < 0].mean() or 0.0)
-            gross_profit = float(
-                results.loc[results["pnl_percent"] > 0, "pnl_nominal"].sum()
-            )
-            gross_loss = abs(
-                float(results.loc[results["pnl_percent"] < 0, "pnl_nominal"].sum())
-            )
-            profit_factor = (
-                float(gross_profit / gross_loss) if gross_loss != 0 else float("inf")
-            )
-
-        final_equity = float(equity_series.iloc[-1])
-        pnl_percent = (final_equity - capital) / capital * 100.0
-
-        row = {
-            "total_trades": total_trades,
-            "win_rate": round(win_rate, 2),
-            "avg_win": round(avg_win, 6),
-            "avg_loss": round(avg_loss, 6),
-            "profit_factor": (
-                round(profit_factor, 4)
-                if profit_factor != float("inf")
-                else float("inf")
-            ),
-            "max_drawdown": round(max_drawdown, 4),
-            "final_equity": f"{round(final_equity, 4)} USDT",
-            "pnl_percent": round(pnl_percent, 4),
-        }
+        row = BacktestService.round_metrics(metrics)
+        row["final_equity"] = f"{row['final_equity']} USDT"
 
         print(row)
@@ -12,7 +12,7 @@ from .bot_session_service import BotSessionService
 
 from services.market_service import MarketService
 from services.backtest_service import BacktestService
-from services.data import DataService
+from services.data import DataService, SharedDataService
 from services.indicator_cache_service import IndicatorCacheService
 
 from dtos.bot_dto import BotResponseDTO, BotCreateDTO, BotUpdateDTO, BotStatus
@@ -24,6 +24,7 @@ class BotService:
     _is_running = {}
     _processes = {}
     _call = 1
+    _shared_manifest = None  # dataset + indikator di shared memory
 
     def __init__(self, market_service: MarketService):
         self.market = market_service
@@ -272,10 +273,14 @@ class BotService:
                 logging.info(f"[{bot_id}] Already running")
                 return
 
+            # publish dataset sekali, semua worker attach read-only by name
+            if BotService._shared_manifest is None:
+                BotService._shared_manifest = DataService.publish_shared()
+
             BotService._is_running[bot_id] = True
             p = multiprocessing.Process(
                 target=BotService._worker_process,
-                args=(bot_id, ticker, bot_name),
+                args=(bot_id, ticker, bot_name, BotService._shared_manifest),
                 daemon=True,
             )
             p.start()
@@ -288,8 +293,11 @@ class BotService:
             raise e
 
     @staticmethod
-    def _worker_process(bot_id, ticker, bot_name):
-        DataService.init()
+    def _worker_process(bot_id, ticker, bot_name, shared_manifest=None):
+        if shared_manifest is not None:
+            DataService.init_shared(shared_manifest)
+        else:
+            DataService.init()
         market = MarketService()
 
         df = live_stopwatch(BacktestService.test_candlestick)()
@@ -338,4 +346,10 @@ class BotService:
             logging.error("Error Stopping Bot : %s", e)
             raise e
 
+    @staticmethod
+    def release_shared():
+        if BotService._shared_manifest is not None:
+            SharedDataService.release(BotService._shared_manifest["name"])
+            BotService._shared_manifest = None
+
     # Bot Control #####
@@ -1,3 +1,6 @@
 from .data_loader_service import DataLoaderService
+from .indicator_store_service import IndicatorStoreService
+from .shared_data_service import SharedDataService
+from .result_store_service import ResultStoreService
 from .cache_service import CacheService
 from .data_service import DataService
@@ -1,5 +1,6 @@
 from .data_service import DataService
-from services.indicator_service import IndicatorService
+from .indicator_store_service import IndicatorStoreService
+from services.indicator_service import IndicatorService, IndicatorMatrix
 
 
 class CacheService:
@@ -14,9 +15,14 @@ class CacheService:
         df = DataService.df_1h  # ambil close dari DF master
         closes = df["close"]
 
-        # Precompute 1–100 EMA sekali saja
-        cls._ema_cache = {
-            n: IndicatorService.ema_series(closes, n) for n in range(1, 101)
-        }
+        # Precompute 1–100 EMA sekali saja (satu matrix periods x bars),
+        # warm start dibuka dari disk (mmap) tanpa hitung ulang
+        periods = range(1, 101)
+        store = IndicatorStoreService.open_frame(df)
+        values = store.get_or_compute(
+            ("ema_matrix", periods.start, periods.stop - 1),
+            lambda: IndicatorService.ema_matrix(closes, periods).values,
+        )
+        cls._ema_cache = IndicatorMatrix(periods, values)
 
         return cls._ema_cache
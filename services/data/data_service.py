@@ -1,15 +1,22 @@
 import time
 import numpy as np
+import pandas as pd
 from services.data import DataLoaderService
+from services.data.shared_data_service import SharedDataService
+from services.indicator_service import IndicatorService
 from utils.logger import time_logger
 
 
 class DataService:
     df_1h = None
+    shared = None  # array indikator dari shared memory (worker)
+
+    _shared_columns = ["open", "high", "low", "close", "volume"]
 
     _data_training = None
     _data_validation = None
     _data_out_of_sample = None
+    _bounds = None
 
     @classmethod
     def init(cls):
@@ -20,6 +27,45 @@ class DataService:
         cls._split_data()
         print("Data Service Ready to Use")
 
+    # ============================================================
+    # SHARED MEMORY (1 dataset untuk semua bot worker)
+    # ============================================================
+    @classmethod
+    def publish_shared(cls) -> dict:
+        """
+        Dipanggil sekali di process owner (API), return manifest
+        yang dikirim ke worker (picklable, cukup nama segment + layout)
+        """
+        if cls.df_1h is None:
+            cls.init()
+
+        df = cls.df_1h
+        close = df["close"].values
+
+        arrays = {col: df[col].values for col in cls._shared_columns}
+        arrays["open_time"] = df["open_time"].values  # datetime64[ns] UTC
+
+        # indikator yang dibaca strategy worker (lihat get_indicator)
+        arrays["rsi_14"] = IndicatorService.rsi_series(close, 14)
+
+        return SharedDataService.publish(arrays)
+
+    @classmethod
+    def init_shared(cls, manifest: dict):
+        print("Data Service Attach Shared ...")
+        arrays = SharedDataService.attach(manifest)
+
+        open_time = pd.DatetimeIndex(arrays["open_time"]).tz_localize("UTC")
+        columns = {"open_time": open_time.tz_convert("Asia/Jakarta")}
+        columns.update({col: arrays[col] for col in cls._shared_columns})
+
+        # copy=False -> kolom OHLCV tetap view ke shared memory
+        cls.df_1h = pd.DataFrame(columns, copy=False)
+        cls.shared = arrays
+
+        cls._split_data()
+        print("Data Service Ready to Use (shared)")
+
     # ============================================================
     # 1. DATA SPLIT 60/20/20
     # ============================================================
@@ -30,6 +76,13 @@ class DataService:
         train_end = int(n * 0.60)
         valid_end = int(n * 0.80)
 
+        # posisi [start, stop) tiap split di df_1h (untuk kernel array / matrix)
+        cls._bounds = {
+            "train": (0, train_end),
+            "valid": (train_end, valid_end),
+            "oos": (valid_end, n),
+        }
+
         cls._data_training = cls.df_1h.iloc[:train_end].reset_index(drop=True)
         cls._data_validation = cls.df_1h.iloc[train_end:valid_end].reset_index(
             drop=True
@@ -40,8 +93,24 @@ class DataService:
     # 2. ACCESSORS
     # ============================================================
     @classmethod
-    def get_df_1h(cls):
-        return cls.df_1h.copy()
+    def get_df_1h(cls, copy: bool = True):
+        """
+        copy=False -> shallow copy: kolom OHLCV tetap view ke data asli
+        (shared memory di worker, read-only), kolom baru hanya di frame ini
+        """
+        return cls.df_1h.copy(deep=copy)
+
+    @classmethod
+    def get_indicator(cls, key: str, compute):
+        # indikator full dataset: dari shared memory jika dipublish, else compute()
+        if cls.shared is not None and key in cls.shared:
+            return cls.shared[key]
+        return compute()
+
+    @classmethod
+    def get_bounds(cls, split: str) -> tuple[int, int]:
+        # split: "train" | "valid" | "oos"
+        return cls._bounds[split]
 
     @classmethod
     def get_train(cls):
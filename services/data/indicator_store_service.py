@@ -0,0 +1,115 @@
+import os
+import shutil
+import hashlib
+import numpy as np
+
+
+class IndicatorStoreService:
+    """
+    Persistent on-disk indicator cache (.npy, dibuka via memory-map)
+    Layout : <root>/<dataset_hash>/<indicator>_<params>[_<i>].npy
+             <indicator>_<params>.parts : jumlah part (value tuple, mis. MACD)
+    dataset_hash = hash isi array input (HLCV) -> data berubah = folder baru (auto invalid)
+    """
+
+    _root = os.path.join("cache", "indicators")
+    # identitas dataset = input indikator, nama sama dengan IndicatorCacheService
+    _dataset_columns = ("high", "low", "close", "volume")
+
+    def __init__(self, dataset_hash: str, root: str | None = None):
+        self.root = root or IndicatorStoreService._root
+        self.dataset_hash = dataset_hash
+        self.path = os.path.join(self.root, dataset_hash)
+        os.makedirs(self.path, exist_ok=True)
+
+    @classmethod
+    def open(cls, root: str | None = None, **arrays: np.ndarray):
+        # mis. IndicatorStoreService.open(close=..., high=..., low=...)
+        return cls(cls.dataset_hash_of(**arrays), root=root)
+
+    @classmethod
+    def open_frame(cls, df, root: str | None = None):
+        # identitas dataset kanonik -> semua pemakai dataset yang sama
+        # berbagi 1 folder, prune() tidak menghapus cache yang masih valid
+        arrays = {col: df[col].values for col in cls._dataset_columns}
+        return cls.open(root=root, **arrays)
+
+    @staticmethod
+    def dataset_hash_of(**arrays: np.ndarray) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        for name in sorted(arrays):
+            arr = np.ascontiguousarray(arrays[name], dtype=np.float64)
+            h.update(f"{name}:{arr.shape}".encode())
+            h.update(arr.tobytes())
+        return h.hexdigest()
+
+    # ================= READ / WRITE =================
+    def load(self, key: tuple):
+        """
+        return: ndarray read-only (mmap, zero-copy), tuple ndarray, atau None (miss)
+        """
+        single = self._file(key)
+        if os.path.exists(single):
+            return np.load(single, mmap_mode="r")
+
+        # tuple: jumlah part dari marker (ditulis terakhir), tanpa marker /
+        # part hilang = miss (crash di tengah save)
+        marker = self._marker_file(key)
+        if not os.path.exists(marker):
+            return None
+        with open(marker) as f:
+            n_parts = int(f.read())
+
+        parts = [self._file(key, i) for i in range(n_parts)]
+        if not all(os.path.exists(part) for part in parts):
+            return None
+
+        return tuple(np.load(part, mmap_mode="r") for part in parts)
+
+    def save(self, key: tuple, value):
+        if isinstance(value, tuple):
+            for i, v in enumerate(value):
+                self._write(self._file(key, i), v)
+
+            tmp = f"{self._marker_file(key)}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                f.write(str(len(value)))
+            os.replace(tmp, self._marker_file(key))
+        else:
+            self._write(self._file(key), value)
+
+    def get_or_compute(self, key: tuple, compute):
+        value = self.load(key)
+        if value is None:
+            value = compute()
+            self.save(key, value)
+        return value
+
+    # ================= MAINTENANCE =================
+    def prune(self):
+        # hapus cache milik dataset lama (hash lain)
+        for name in os.listdir(self.root):
+            if name != self.dataset_hash:
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
+
+    # ================= INTERNAL =================
+    def _file(self, key: tuple, part: int | None = None) -> str:
+        name = "_".join(str(k) for k in key)
+        if part is not None:
+            name = f"{name}_{part}"
+        return os.path.join(self.path, f"{name}.npy")
+
+    def _marker_file(self, key: tuple) -> str:
+        return self._file(key).replace(".npy", ".parts")
+
+    @staticmethod
+    def _write(path: str, value: np.ndarray):
+        # tulis ke file sementara lalu rename (atomic, aman dari crash / race worker)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(value))
+        os.replace(tmp, path)
@@ -0,0 +1,183 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+
+
+class ResultStoreService:
+    """
+    Columnar result store untuk output sweep (pengganti CSV untuk tabel besar)
+    Layout : <root>/<name>/schema.json       : dtype + daftar partisi (rows, min/max)
+             <root>/<name>/part_XXXXX.npz    : 1 member terkompresi per kolom
+
+    - append() = 1 partisi baru, file lama tidak ditulis ulang
+    - read() hanya decompress kolom yang diminta, partisi di luar
+      range filter di-skip dari statistik min/max tanpa dibuka
+    """
+
+    _root = os.path.join("results", "store")
+
+    def __init__(self, name: str, root: str | None = None, reset: bool = False):
+        self.name = name
+        self.path = os.path.join(root or ResultStoreService._root, name)
+
+        if reset:
+            shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
+
+        self.schema = self._load_schema()
+
+    # ================= INFO =================
+    @property
+    def dtype(self) -> np.dtype | None:
+        if self.schema["dtype"] is None:
+            return None
+        return np.dtype([tuple(field) for field in self.schema["dtype"]])
+
+    @property
+    def columns(self) -> list:
+        return list(self.dtype.names) if self.dtype is not None else []
+
+    @property
+    def n_rows(self) -> int:
+        return sum(part["rows"] for part in self.schema["partitions"])
+
+    # ================= WRITE =================
+    def append(self, table: np.ndarray, partition_rows: int | None = None):
+        """
+        table: structured array (mis. METRICS_DTYPE), dtype harus sama antar append
+        partition_rows: pecah table besar jadi beberapa partisi
+        """
+        if table is None or len(table) == 0:
+            return
+        if table.dtype.names is None:
+            raise ValueError("ResultStore butuh structured array")
+
+        if self.dtype is None:
+            self.schema["dtype"] = [list(field) for field in table.dtype.descr]
+        elif table.dtype != self.dtype:
+            raise ValueError(
+                f"dtype berbeda dengan result store '{self.name}': "
+                f"{table.dtype} != {self.dtype}"
+            )
+
+        step = partition_rows or len(table)
+        for start in range(0, len(table), step):
+            self._write_partition(table[start : start + step])
+
+        self._save_schema()
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
+        self.schema = self._load_schema()
+
+    # ================= READ =================
+    def read(
+        self, columns: list | None = None, filters: dict | None = None
+    ) -> np.ndarray:
+        """
+        columns: kolom yang diambil (default semua)
+        filters: {kolom: (min, max)} inklusif, None = tanpa batas
+                 mis. {"ema_fast": (10, 30), "profit_factor": (1.2, None)}
+        return: structured array
+        """
+        dtype = self.dtype
+        if dtype is None:
+            return np.empty(0)
+
+        columns = list(columns or dtype.names)
+        filters = filters or {}
+        for col in [*columns, *filters]:
+            if col not in dtype.names:
+                raise KeyError(f"Kolom '{col}' tidak ada di result store '{self.name}'")
+
+        out_dtype = np.dtype([(col, dtype[col]) for col in columns])
+        parts = []
+
+        for part in self.schema["partitions"]:
+            if not self._may_match(part, filters):
+                continue
+
+            with np.load(os.path.join(self.path, part["file"])) as npz:
+                mask = np.ones(part["rows"], dtype=bool)
+                for col, (lo, hi) in filters.items():
+                    values = npz[col]
+                    if lo is not None:
+                        mask &= values >= lo
+                    if hi is not None:
+                        mask &= values <= hi
+
+                n = int(mask.sum())
+                if n == 0:
+                    continue
+
+                out = np.empty(n, dtype=out_dtype)
+                for col in columns:
+                    out[col] = npz[col][mask]
+                parts.append(out)
+
+        return np.concatenate(parts) if parts else np.empty(0, dtype=out_dtype)
+
+    def read_frame(
+        self, columns: list | None = None, filters: dict | None = None
+    ) -> pd.DataFrame:
+        return pd.DataFrame(self.read(columns, filters))
+
+    # ================= INTERNAL =================
+    def _write_partition(self, table: np.ndarray):
+        file = f"part_{len(self.schema['partitions']):05d}.npz"
+        path = os.path.join(self.path, file)
+
+        # stats hanya kolom numerik, None = semua NaN (tidak ada nilai yang lolos range)
+        stats = {}
+        for col in table.dtype.names:
+            values = table[col]
+            if values.dtype.kind not in "iuf":
+                continue
+            if np.isnan(values.astype(float)).all():
+                stats[col] = None
+                continue
+            stats[col] = [float(np.nanmin(values)), float(np.nanmax(values))]
+
+        # tulis ke file sementara lalu rename (atomic)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **{col: table[col] for col in table.dtype.names})
+        os.replace(tmp, path)
+
+        self.schema["partitions"].append(
+            {"file": file, "rows": len(table), "stats": stats}
+        )
+
+    @staticmethod
+    def _may_match(part: dict, filters: dict) -> bool:
+        for col, (lo, hi) in filters.items():
+            if col not in part["stats"] or (lo is None and hi is None):
+                # tanpa statistik (bool / string / partisi lama) -> cek per baris
+                continue
+            stats = part["stats"][col]
+            if stats is None:
+                # kolom semua NaN -> tidak ada baris yang lolos range
+                return False
+            if lo is not None and stats[1] < lo:
+                return False
+            if hi is not None and stats[0] > hi:
+                return False
+        return True
+
+    def _schema_file(self) -> str:
+        return os.path.join(self.path, "schema.json")
+
+    def _load_schema(self) -> dict:
+        if not os.path.exists(self._schema_file()):
+            return {"name": self.name, "dtype": None, "partitions": []}
+        with open(self._schema_file()) as f:
+            return json.load(f)
+
+    def _save_schema(self):
+        tmp = f"{self._schema_file()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.schema, f, indent=2)
+        os.replace(tmp, self._schema_file())
@@ -0,0 +1,91 @@
+import numpy as np
+
+from multiprocessing import shared_memory
+
+
+class SharedDataService:
+    """
+    Dataset + indikator di satu segment shared memory
+    Owner (API process) publish sekali, worker attach read-only by name (tanpa copy)
+
+    manifest = {
+        "name": <nama segment>,
+        "arrays": {key: {"offset": int, "shape": tuple, "dtype": str}},
+    }
+    """
+
+    _owned: dict = {}  # name -> SharedMemory (owner, di-unlink saat release)
+    _attached: dict = {}  # name -> SharedMemory (worker, handle harus tetap hidup)
+
+    _align = 64  # cache-line alignment tiap array
+
+    # ================= OWNER =================
+    @classmethod
+    def publish(cls, arrays: dict) -> dict:
+        layout = {}
+        offset = 0
+        for key, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            offset = -(-offset // cls._align) * cls._align
+            layout[key] = {
+                "offset": offset,
+                "shape": arr.shape,
+                "dtype": arr.dtype.str,
+            }
+            offset += arr.nbytes
+
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+
+        for key, arr in arrays.items():
+            meta = layout[key]
+            view = np.ndarray(
+                meta["shape"],
+                dtype=meta["dtype"],
+                buffer=shm.buf,
+                offset=meta["offset"],
+            )
+            view[...] = arr
+
+        cls._owned[shm.name] = shm
+        return {"name": shm.name, "arrays": layout}
+
+    @classmethod
+    def release(cls, name: str | None = None):
+        names = [name] if name else list(cls._owned)
+        for n in names:
+            shm = cls._owned.pop(n, None)
+            if shm is None:
+                continue
+            shm.close()
+            shm.unlink()
+
+    # ================= WORKER =================
+    @classmethod
+    def attach(cls, manifest: dict) -> dict:
+        name = manifest["name"]
+
+        shm = cls._attached.get(name) or cls._owned.get(name)
+        if shm is None:
+            # worker di-spawn dari owner -> resource_tracker yang sama,
+            # segment tidak di-unlink saat worker exit (hanya saat owner release)
+            shm = shared_memory.SharedMemory(name=name)
+            cls._attached[name] = shm
+
+        arrays = {}
+        for key, meta in manifest["arrays"].items():
+            arr = np.ndarray(
+                tuple(meta["shape"]),
+                dtype=meta["dtype"],
+                buffer=shm.buf,
+                offset=meta["offset"],
+            )
+            arr.flags.writeable = False
+            arrays[key] = arr
+
+        return arrays
+
+    @classmethod
+    def detach(cls, name: str):
+        shm = cls._attached.pop(name, None)
+        if shm is not None:
+            shm.close()
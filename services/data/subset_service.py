@@ -40,13 +40,9 @@ class SubsetService:
         # nVol = ATR / Close
         # =========================================================
         ATR_LEN = 14
-        # Siapkan OHLC untuk ATR
-        prices = [
-            {"high": h, "low": l, "close": c}
-            for h, l, c in zip(df["high"], df["low"], df["close"])
-        ]
-
-        df["atr"] = IndicatorService.atr_series(prices, ATR_LEN)
+        df["atr"] = IndicatorService.atr_series(
+            df["high"], df["low"], df["close"], ATR_LEN
+        )
 
         df["nvol"] = df["atr"] / df["close"]
 
@@ -4,6 +4,7 @@ import pandas as pd
 from services.data import DataService
 from services.indicator_cache_service import IndicatorCacheService
 from services.indicator_service import IndicatorService
+from services.signal_service import SignalService
 
 
 class EMAService:
@@ -15,11 +16,16 @@ class EMAService:
         full_df = DataService.get_df_1h()  # HARUS FULL DATASET
         full_df["open_time"] = pd.to_datetime(full_df["open_time"])
 
+        close = full_df["close"].values
+        high = full_df["high"].values
+        low = full_df["low"].values
+
         cls._cache = IndicatorCacheService(
-            close=full_df["close"].values,
-            high=full_df["high"].values,
-            low=full_df["low"].values,
+            close=close,
+            high=high,
+            low=low,
             volume=full_df["volume"].values,
+            persist=True,
         )
 
         cls._full_time = full_df["open_time"].values
@@ -29,7 +35,31 @@ class EMAService:
         print("LEN time :", len(cls._full_time))
 
     @classmethod
-    def ema_tuning(cls, ema_fast: int, ema_slow: int):
+    def preload_ema(cls, periods):
+        # batch compute EMA (satu matrix) sebelum sweep
+        if cls._cache is None:
+            cls.init()
+
+        return cls._cache.get_ema_matrix(periods)
+
+    @classmethod
+    def get_close(cls):
+        if cls._cache is None:
+            cls.init()
+
+        return cls._cache.close
+
+    @classmethod
+    def get_volatility(cls, length: int = 14):
+        # volatilitas relatif per bar (ATR / close), untuk slippage_vol
+        if cls._cache is None:
+            cls.init()
+
+        return cls._cache.get_atr(length) / cls._cache.close
+
+    @classmethod
+    def ema_tuning(cls, ema_fast: int, ema_slow: int, sparse: bool = False):
+        # sparse=True -> "signals" (SignalEvents) menggantikan array bool buy / sell
 
         # ✅ AUTO INIT JIKA BELUM ADA
         if cls._cache is None:
@@ -44,12 +74,14 @@ class EMAService:
         closes = train_df["close"].values
         open_time = train_df["open_time"].values
 
-        cross = ema_f - ema_s
-        cross_prev = np.roll(cross, 1)
-        cross_prev[0] = 0.0
+        if sparse:
+            return {
+                "close": closes,
+                "open_time": open_time,
+                "signals": SignalService.cross_events(ema_f, ema_s),
+            }
 
-        buy = (cross_prev < 0) & (cross > 0)
-        sell = (cross_prev > 0) & (cross < 0)
+        buy, sell = SignalService.cross_dense(ema_f, ema_s)
 
         return {
             "close": closes,
@@ -59,7 +91,9 @@ class EMAService:
         }
 
     @classmethod
-    def ema_tuning_subset(cls, ema_fast: int, ema_slow: int, start_date, end_date):
+    def ema_tuning_subset(
+        cls, ema_fast: int, ema_slow: int, start_date, end_date, sparse: bool = False
+    ):
 
         # ✅ AUTO INIT
         if cls._cache is None:
@@ -91,13 +125,15 @@ class EMAService:
         closes = cls._cache.close[mask]
         open_time = full_time[mask]
 
-        # ✅ SIGNAL
-        cross = ema_f - ema_s
-        cross_prev = np.roll(cross, 1)
-        cross_prev[0] = 0.0
+        if sparse:
+            return {
+                "close": closes,
+                "open_time": open_time,
+                "signals": SignalService.cross_events(ema_f, ema_s),
+            }
 
-        buy = (cross_prev < 0) & (cross > 0)
-        sell = (cross_prev > 0) & (cross < 0)
+        # ✅ SIGNAL
+        buy, sell = SignalService.cross_dense(ema_f, ema_s)
 
         return {
             "close": closes,
@@ -106,6 +142,31 @@ class EMAService:
             "sell": sell,
         }
 
+    @classmethod
+    def segment_bounds(cls, start_dates, end_dates, min_bars: int = 50):
+        """
+        Block waktu [start, end] -> index bar [lo, hi) via binary search (sekali)
+        sama dengan mask di ema_tuning_subset (tz dibuang, inklusif kedua ujung)
+        return: (lo, hi, valid) int64 / bool, valid = jumlah bar >= min_bars
+        """
+        if cls._cache is None:
+            cls.init()
+
+        def naive(dates):
+            return np.array(
+                [
+                    (d.tz_localize(None) if d.tzinfo is not None else d).to_datetime64()
+                    for d in map(pd.Timestamp, dates)
+                ],
+                dtype=cls._full_time.dtype,
+            )
+
+        lo = np.searchsorted(cls._full_time, naive(start_dates), side="left")
+        hi = np.searchsorted(cls._full_time, naive(end_dates), side="right")
+        hi = np.maximum(hi, lo)
+
+        return lo.astype(np.int64), hi.astype(np.int64), (hi - lo) >= min_bars
+
     @staticmethod
     def regime_detection():
         df = DataService.get_train()
@@ -139,13 +200,9 @@ class EMAService:
         # nVol = ATR / Close
         # =========================================================
         ATR_LEN = 14
-        # Siapkan OHLC untuk ATR
-        prices = [
-            {"high": h, "low": l, "close": c}
-            for h, l, c in zip(df["high"], df["low"], df["close"])
-        ]
-
-        df["atr"] = IndicatorService.atr_series(prices, ATR_LEN)
+        df["atr"] = IndicatorService.atr_series(
+            df["high"], df["low"], df["close"], ATR_LEN
+        )
 
         df["nvol"] = df["atr"] / df["close"]
 
@@ -0,0 +1,205 @@
+import numpy as np
+
+# ===== ALASAN EXIT =====
+EXIT_OPEN = 0  # belum exit sampai akhir data
+EXIT_TAKE_PROFIT = 1
+EXIT_STOP_LOSS = 2
+EXIT_TRAILING_STOP = 3
+EXIT_MAX_BARS = 4
+
+EXIT_REASONS = {
+    EXIT_OPEN: "open",
+    EXIT_TAKE_PROFIT: "take_profit",
+    EXIT_STOP_LOSS: "stop_loss",
+    EXIT_TRAILING_STOP: "trailing_stop",
+    EXIT_MAX_BARS: "max_bars",
+}
+
+
+class ExitService:
+    """
+    Resolusi exit intrabar (TP / SL / trailing / max bars) dari array high & low
+    - first passage dicari per blok bar yang membesar 2x (galloping),
+      tiap blok dicek vectorized -> kerja sebanding panjang trade, bukan n
+    - bar yang sama kena stop & TP -> stop dulu (urutan intrabar tidak diketahui,
+      diasumsikan yang terburuk)
+    - trailing stop dari high tertinggi SEBELUM bar yang dicek (tanpa look-ahead)
+    """
+
+    _block = 16  # ukuran blok awal first passage
+
+    @staticmethod
+    def run(
+        entry_signal,
+        entry_price,
+        high,
+        low,
+        close=None,
+        tp_pct: float | None = None,
+        sl_pct: float | None = None,
+        trail_pct: float | None = None,
+        max_bars: int | None = None,
+        check_entry_bar: bool = False,
+    ) -> dict:
+        """
+        Posisi long berurutan (tidak overlap):
+        entry_signal[i] = True -> boleh entry di bar i jika sedang flat
+        (entry berikutnya paling cepat 1 bar setelah exit)
+        entry_price : harga entry per bar (mis. open untuk entry di open)
+        return: dict array entry_idx, entry_price, exit_idx, exit_price, reason
+        """
+        entry_price = np.asarray(entry_price, dtype=float)
+        high, low, close = ExitService._as_arrays(high, low, close)
+        candidates = np.flatnonzero(np.asarray(entry_signal, dtype=bool))
+
+        entries, exits, prices, reasons = [], [], [], []
+
+        pos = 0
+        while pos < candidates.size:
+            e = int(candidates[pos])
+            x, px, reason = ExitService.first_exit(
+                e,
+                entry_price[e],
+                high,
+                low,
+                close,
+                tp_pct,
+                sl_pct,
+                trail_pct,
+                max_bars,
+                check_entry_bar,
+            )
+
+            entries.append(e)
+            exits.append(x)
+            prices.append(px)
+            reasons.append(reason)
+
+            if reason == EXIT_OPEN:
+                break
+            pos = int(np.searchsorted(candidates, x + 1, side="left"))
+
+        entry_idx = np.array(entries, dtype=np.int64)
+        return {
+            "entry_idx": entry_idx,
+            "entry_price": entry_price[entry_idx],
+            "exit_idx": np.array(exits, dtype=np.int64),
+            "exit_price": np.array(prices, dtype=float),
+            "reason": np.array(reasons, dtype=np.int8),
+        }
+
+    @staticmethod
+    def resolve(
+        entry_idx,
+        entry_price,
+        high,
+        low,
+        close=None,
+        tp_pct: float | None = None,
+        sl_pct: float | None = None,
+        trail_pct: float | None = None,
+        max_bars: int | None = None,
+        check_entry_bar: bool = False,
+    ) -> dict:
+        """
+        Exit untuk entry yang sudah ditentukan (boleh overlap), 1 exit per entry
+        return: dict array exit_idx (-1 jika open), exit_price, reason
+        """
+        entry_idx = np.asarray(entry_idx, dtype=np.int64)
+        entry_price = np.asarray(entry_price, dtype=float)
+        high, low, close = ExitService._as_arrays(high, low, close)
+
+        exit_idx = np.empty(entry_idx.size, dtype=np.int64)
+        exit_price = np.empty(entry_idx.size, dtype=float)
+        reason = np.empty(entry_idx.size, dtype=np.int8)
+
+        for j in range(entry_idx.size):
+            exit_idx[j], exit_price[j], reason[j] = ExitService.first_exit(
+                int(entry_idx[j]),
+                entry_price[j],
+                high,
+                low,
+                close,
+                tp_pct,
+                sl_pct,
+                trail_pct,
+                max_bars,
+                check_entry_bar,
+            )
+
+        return {"exit_idx": exit_idx, "exit_price": exit_price, "reason": reason}
+
+    @staticmethod
+    def first_exit(
+        entry_idx: int,
+        entry_price: float,
+        high,
+        low,
+        close=None,
+        tp_pct: float | None = None,
+        sl_pct: float | None = None,
+        trail_pct: float | None = None,
+        max_bars: int | None = None,
+        check_entry_bar: bool = False,
+    ) -> tuple[int, float, int]:
+        """
+        high / low / close: ndarray float (lihat _as_arrays)
+        return: (exit_idx, exit_price, reason), (-1, nan, EXIT_OPEN) jika tidak exit
+        """
+        n = len(high)
+        begin = entry_idx if check_entry_bar else entry_idx + 1
+        end = n if max_bars is None else min(n, entry_idx + max_bars + 1)
+
+        tp_level = entry_price * (1 + (tp_pct / 100)) if tp_pct is not None else None
+        sl_level = entry_price * (1 - (sl_pct / 100)) if sl_pct is not None else None
+        peak = entry_price
+
+        start = begin
+        width = ExitService._block
+        while start < end:
+            stop = min(start + width, end)
+            h = high[start:stop]
+            l = low[start:stop]
+
+            # level stop per bar (SL tetap, trailing dari peak bar sebelumnya)
+            stop_level = np.full(stop - start, -np.inf)
+            stop_reason = np.full(stop - start, EXIT_STOP_LOSS, dtype=np.int8)
+            if sl_level is not None:
+                stop_level[:] = sl_level
+            if trail_pct is not None:
+                prev_peak = np.empty(stop - start)
+                prev_peak[0] = peak
+                np.maximum(peak, np.maximum.accumulate(h[:-1]), out=prev_peak[1:])
+                trail_level = prev_peak * (1 - (trail_pct / 100))
+                stop_reason[trail_level > stop_level] = EXIT_TRAILING_STOP
+                stop_level = np.maximum(stop_level, trail_level)
+
+            hit_stop = l <= stop_level
+            hit_tp = h >= tp_level if tp_level is not None else np.zeros_like(hit_stop)
+            hit = hit_stop | hit_tp
+
+            if hit.any():
+                k = int(np.argmax(hit))
+                if hit_stop[k]:
+                    return start + k, float(stop_level[k]), int(stop_reason[k])
+                return start + k, float(tp_level), EXIT_TAKE_PROFIT
+
+            if trail_pct is not None:
+                peak = max(peak, float(h.max()))
+            start = stop
+            width *= 2
+
+        # tidak kena level sampai batas max_bars -> exit di close bar terakhir
+        if max_bars is not None and entry_idx + max_bars < n:
+            if close is None:
+                raise ValueError("max_bars butuh array close")
+            return end - 1, float(close[end - 1]), EXIT_MAX_BARS
+
+        return -1, np.nan, EXIT_OPEN
+
+    @staticmethod
+    def _as_arrays(high, low, close=None):
+        high = np.asarray(high, dtype=float)
+        low = np.asarray(low, dtype=float)
+        close = np.asarray(close, dtype=float) if close is not None else None
+        return high, low, close
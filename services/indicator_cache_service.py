@@ -1,5 +1,9 @@
+import hashlib
 import numpy as np
-from services.indicator_service import IndicatorService
+
+from collections import OrderedDict
+from services.data.indicator_store_service import IndicatorStoreService
+from services.indicator_service import IndicatorService, IndicatorMatrix
 
 
 class IndicatorCacheService:
@@ -9,6 +13,9 @@ class IndicatorCacheService:
         high: np.ndarray | None = None,
         low: np.ndarray | None = None,
         volume: np.ndarray | None = None,
+        max_bytes: int | None = 512 * 1024**2,
+        persist: bool = False,
+        store_root: str | None = None,
     ):
         # ===== RAW ARRAYS (PERMANENT) =====
         self.close = close.astype(float)
@@ -16,47 +23,251 @@ class IndicatorCacheService:
         self.low = low.astype(float) if low is not None else None
         self.volume = volume.astype(float) if volume is not None else None
 
-        # ===== INDICATOR CACHES (LAZY) =====
-        self._ema_cache = {}
-        self._sma_cache = {}
-        self._atr_cache = {}
-        # future:
-        # self._rsi_cache = {}
-        # self._adx_cache = {}
-        # self._macd_cache = {}
+        # ===== INDICATOR CACHE (LAZY, LRU) =====
+        # key   : (indicator, *params) mis. ("ema", 13), ("bb", 20, 2.0)
+        # value : ndarray atau tuple ndarray
+        # max_bytes=None -> tanpa batas
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()
+        self._bytes = 0
+
+        # ===== PERSISTENT STORE (OPSIONAL) =====
+        # IndicatorStoreService: miss di memory -> coba mmap dari disk dulu
+        # di-key dari array cache ini sendiri -> tidak bisa tertukar dataset lain
+        self.store = None
+        if persist:
+            arrays = {
+                "close": self.close,
+                "high": self.high,
+                "low": self.low,
+                "volume": self.volume,
+            }
+            self.store = IndicatorStoreService.open(
+                root=store_root,
+                **{name: arr for name, arr in arrays.items() if arr is not None},
+            )
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
 
     # ================= EMA =================
     def get_ema(self, period: int):
-        if period not in self._ema_cache:
-            self._ema_cache[period] = np.asarray(
-                IndicatorService.ema_series(self.close, period, use_ema_seed=True),
-                dtype=float,
-            )
-        return self._ema_cache[period]
+        return self._get(
+            ("ema", int(period)),
+            lambda: IndicatorService.ema_series(self.close, period, use_ema_seed=True),
+        )
+
+    def get_ema_matrix(self, periods):
+        # semua period dalam satu batch (1 matrix)
+        return self._get_matrix(
+            "ema",
+            periods,
+            lambda periods: IndicatorService.ema_matrix(
+                self.close, periods, use_ema_seed=True
+            ),
+        )
+
+    # ================= SMA =================
+    def get_sma(self, period: int):
+        return self._get(
+            ("sma", int(period)),
+            lambda: np.asarray(
+                IndicatorService.ma_series(self.close, period), dtype=float
+            ),
+        )
+
+    # ================= RSI =================
+    def get_rsi(self, period: int = 14):
+        return self._get(
+            ("rsi", int(period)),
+            lambda: IndicatorService.rsi_series(self.close, period),
+        )
+
+    def get_rsi_matrix(self, periods):
+        return self._get_matrix(
+            "rsi",
+            periods,
+            lambda periods: IndicatorService.rsi_matrix(self.close, periods),
+        )
 
     # ================= ATR =================
     def get_atr(self, period: int):
-        if period not in self._atr_cache:
-            atr = IndicatorService.atr_series(self.prices, length=period)
-            self._atr_cache[period] = np.asarray(atr, dtype=float)
+        self._require_hlc()
+        return self._get(
+            ("atr", int(period)),
+            lambda: IndicatorService.atr_series(
+                self.high, self.low, self.close, length=period
+            ),
+        )
 
-        return self._atr_cache[period]
+    def get_atr_matrix(self, periods):
+        self._require_hlc()
+        return self._get_matrix(
+            "atr",
+            periods,
+            lambda periods: IndicatorService.atr_matrix(
+                self.high, self.low, self.close, periods
+            ),
+        )
 
-    # ================= SMA =================
-    def get_sma(self, period: int):
-        if period not in self._sma_cache:
-            self._sma_cache[period] = np.asarray(
-                IndicatorService.ma_series(self.series, period),
-                dtype=float,
-            )
+    # ================= MACD =================
+    def get_macd(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        # return: (macd, signal_line, histogram)
+        return self._get(
+            ("macd", int(fast), int(slow), int(signal)),
+            lambda: IndicatorService.macd_series(self.close, fast, slow, signal),
+        )
+
+    # ================= BOLLINGER =================
+    def get_bollinger(self, period: int = 20, std_dev: float | list = 2):
+        # return: (upper, lower), std_dev list -> shape (len(std_dev), bars)
+        if np.ndim(std_dev) == 0:
+            key = ("bb", int(period), float(std_dev))
+        else:
+            key = ("bb_multi", int(period), *np.atleast_1d(std_dev).astype(float))
 
-        return self._sma_cache[period]
+        return self._get(
+            key,
+            lambda: IndicatorService.bollinger_bands_series(
+                self.close, period, std_dev
+            ),
+        )
+
+    # ================= STOCHASTIC =================
+    def get_stochastic(
+        self, k_length: int = 14, k_smoothing: int = 3, d_smoothing: int = 3
+    ):
+        # return: (smoothed_k, d)
+        self._require_hlc()
+        return self._get(
+            ("stoch", int(k_length), int(k_smoothing), int(d_smoothing)),
+            lambda: IndicatorService.stochastic_series(
+                self.close, self.high, self.low, k_length, k_smoothing, d_smoothing
+            ),
+        )
+
+    # ================= STATS / RESET =================
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._cache),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
 
-    # ================= RESET =================
     def reset(self):
-        if self._ema_cache is not None:
-            self._ema_cache.clear()
-        if self._atr_cache is not None:
-            self._atr_cache.clear()
-        if self._sma_cache is not None:
-            self._sma_cache.clear()
+        self._cache.clear()
+        self._bytes = 0
+
+    # ================= INTERNAL =================
+    def _require_hlc(self):
+        if self.high is None or self.low is None:
+            raise ValueError("Indikator ini butuh array high & low")
+
+    def _get(self, key: tuple, compute):
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return value
+
+        # row dari matrix yang sudah di-cache: view, budget sudah dihitung di matrix
+        row = self._matrix_row(key)
+        if row is not None:
+            self.hits += 1
+            return row
+
+        self.misses += 1
+        value = self._load_or_compute(key, compute)
+        self._put(key, value)
+        return value
+
+    def _matrix_row(self, key: tuple):
+        # key (name, period) -> cari entry (name, "matrix", periods) yang memuat period
+        if len(key) != 2:
+            return None
+
+        name, period = key
+        for cached in reversed(self._cache):
+            if (
+                len(cached) == 3
+                and cached[:2] == (name, "matrix")
+                and period in cached[2]
+            ):
+                self._cache.move_to_end(cached)
+                return self._cache[cached][cached[2].index(period)]
+
+        return None
+
+    def _get_matrix(self, name: str, periods, compute):
+        """
+        1 entry cache per set period (name, "matrix", periods): matrix yang sama
+        dikembalikan tiap panggilan, budget dihitung per matrix
+        store: 1 file per set period -> warm start = 1 mmap tanpa stack / copy
+        """
+        periods = tuple(int(p) for p in periods)
+        key = (name, "matrix", periods)
+
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return IndicatorMatrix(periods, value)
+
+        self.misses += 1
+
+        def compute_values():
+            return compute(list(periods)).values
+
+        if self.store is None:
+            value = compute_values()
+        else:
+            value = self.store.get_or_compute(
+                IndicatorCacheService._matrix_store_key(name, periods),
+                compute_values,
+            )
+
+        self._put(key, value)
+        return IndicatorMatrix(periods, value)
+
+    @staticmethod
+    def _matrix_store_key(name: str, periods: tuple) -> tuple:
+        # nama file pendek berapapun jumlah period
+        digest = hashlib.blake2b(
+            np.asarray(periods, dtype=np.int64).tobytes(), digest_size=8
+        ).hexdigest()
+        return (f"{name}_matrix", digest)
+
+    def _load_or_compute(self, key: tuple, compute):
+        if self.store is None:
+            return compute()
+        return self.store.get_or_compute(key, compute)
+
+    def _put(self, key: tuple, value):
+        size = self._nbytes(value)
+
+        # item lebih besar dari budget -> tidak disimpan
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._bytes -= self._nbytes(old)
+
+        self._cache[key] = value
+        self._bytes += size
+
+        # LRU eviction sampai muat di budget
+        while self.max_bytes is not None and self._bytes > self.max_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._bytes -= self._nbytes(evicted)
+            self.evictions += 1
+
+    @staticmethod
+    def _nbytes(value) -> int:
+        if isinstance(value, tuple):
+            return sum(v.nbytes for v in value)
+        return value.nbytes
@@ -1,37 +1,318 @@
 import numpy as np
 
-from typing import List, Sequence, Optional, Dict
+from numba import njit
+from typing import List, Sequence, Optional
+
+
+def _as_float_array(values) -> np.ndarray:
+    # Series / list / ndarray -> ndarray float64 contiguous (tanpa copy jika sudah)
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+# ============================================================
+# KERNELS (compiled, bit-identik dengan loop Python lama)
+# ============================================================
+@njit(cache=True)
+def _ema_fill(prices, period, use_ema_seed, out):
+    n = prices.shape[0]
+    if n == 0:
+        return
+
+    k = 2 / (period + 1)
+
+    if use_ema_seed:
+        out[0] = prices[0]
+        start = 1
+    else:
+        # SMA seed dijumlah berurutan (sama seperti sum() Python)
+        total = 0.0
+        for i in range(period):
+            total += prices[i]
+        out[period - 1] = total / period
+        start = period
+
+    for i in range(start, n):
+        out[i] = prices[i] * k + out[i - 1] * (1 - k)
+
+
+@njit(cache=True)
+def _ema_kernel(prices, period, use_ema_seed):
+    ema = np.full(prices.shape[0], np.nan)
+    _ema_fill(prices, period, use_ema_seed, ema)
+    return ema
+
+
+@njit(cache=True)
+def _ema_matrix_kernel(prices, periods, use_ema_seed):
+    # satu baris per period, baris contiguous -> cache friendly
+    out = np.full((periods.shape[0], prices.shape[0]), np.nan)
+    for j in range(periods.shape[0]):
+        _ema_fill(prices, periods[j], use_ema_seed, out[j])
+    return out
+
+
+@njit(cache=True)
+def _rolling_extrema_kernel(values, window, is_max):
+    # monotonic deque (index buffer + head/tail pointer) -> O(n)
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    dq = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+
+    for i in range(n):
+        v = values[i]
+        if is_max:
+            while tail > head and values[dq[tail - 1]] <= v:
+                tail -= 1
+        else:
+            while tail > head and values[dq[tail - 1]] >= v:
+                tail -= 1
+        dq[tail] = i
+        tail += 1
+
+        # buang index yang sudah keluar window
+        if dq[head] <= i - window:
+            head += 1
+
+        if i >= window - 1:
+            out[i] = values[dq[head]]
+
+    return out
+
+
+@njit(cache=True)
+def _rolling_mean_kernel(values, window, start):
+    # running sum O(n), values valid mulai index `start`
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    first = start + window - 1
+    if first >= n:
+        return out
+
+    if window == 1:
+        for i in range(start, n):
+            out[i] = values[i]
+        return out
+
+    total = 0.0
+    for i in range(start, first + 1):
+        total += values[i]
+    out[first] = total / window
+
+    for i in range(first + 1, n):
+        total += values[i] - values[i - window]
+        out[i] = total / window
+
+    return out
+
+
+@njit(cache=True)
+def _stochastic_kernel(closes, highs, lows, k_length, k_smoothing, d_smoothing):
+    n = closes.shape[0]
+    low_min = _rolling_extrema_kernel(lows, k_length, False)
+    high_max = _rolling_extrema_kernel(highs, k_length, True)
+
+    # raw %K
+    raw_k = np.full(n, np.nan)
+    for i in range(k_length - 1, n):
+        rng = high_max[i] - low_min[i]
+        raw_k[i] = 100 * (closes[i] - low_min[i]) / rng if rng != 0 else 0.0
+
+    # smooth %K lalu %D dari smoothed %K
+    smoothed_k = _rolling_mean_kernel(raw_k, k_smoothing, k_length - 1)
+    d = _rolling_mean_kernel(
+        smoothed_k, d_smoothing, k_length - 1 + k_smoothing - 1
+    )
+    return smoothed_k, d
+
+
+@njit(cache=True)
+def _rolling_mean_std_kernel(values, window):
+    # rolling Welford (geser 1 bar: tambah nilai baru, buang nilai lama) -> O(n)
+    n = values.shape[0]
+    mean_out = np.full(n, np.nan)
+    std_out = np.full(n, np.nan)
+    if window > n:
+        return mean_out, std_out
+
+    mean = 0.0
+    m2 = 0.0
+    for i in range(window):
+        delta = values[i] - mean
+        mean += delta / (i + 1)
+        m2 += delta * (values[i] - mean)
+
+    mean_out[window - 1] = mean
+    std_out[window - 1] = (m2 / window) ** 0.5 if m2 > 0 else 0.0
+
+    for i in range(window, n):
+        if i % window == 0:
+            # resync tiap `window` bar (two-pass exact) -> drift tidak menumpuk,
+            # total tetap O(n)
+            total = 0.0
+            for j in range(i - window + 1, i + 1):
+                total += values[j]
+            mean = total / window
+            m2 = 0.0
+            for j in range(i - window + 1, i + 1):
+                m2 += (values[j] - mean) ** 2
+        else:
+            new = values[i]
+            old = values[i - window]
+            prev_mean = mean
+            mean = prev_mean + (new - old) / window
+            m2 += (new - old) * (new - mean + old - prev_mean)
+
+        mean_out[i] = mean
+        std_out[i] = (m2 / window) ** 0.5 if m2 > 0 else 0.0
+
+    return mean_out, std_out
+
+
+@njit(cache=True)
+def _rsi_fill(prices, period, out):
+    # Wilder RSI, urutan operasi sama dengan loop Python lama
+    n = prices.shape[0]
+    if n <= period:
+        return
+
+    # seed = rata-rata gains/losses[0:period] (gains[0] = 0)
+    sum_gain = 0.0
+    sum_loss = 0.0
+    for i in range(1, period):
+        delta = prices[i] - prices[i - 1]
+        if delta > 0:
+            sum_gain += delta
+        elif delta < 0:
+            sum_loss += -delta
+
+    avg_gain = sum_gain / period
+    avg_loss = sum_loss / period
+    out[period] = 100 - (100 / (1 + avg_gain / avg_loss)) if avg_loss != 0 else 100.0
+
+    for i in range(period + 1, n):
+        delta = prices[i] - prices[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+        out[i] = 100 - (100 / (1 + avg_gain / avg_loss)) if avg_loss != 0 else 100.0
+
+
+@njit(cache=True)
+def _rsi_matrix_kernel(prices, periods):
+    out = np.full((periods.shape[0], prices.shape[0]), np.nan)
+    for j in range(periods.shape[0]):
+        _rsi_fill(prices, periods[j], out[j])
+    return out
+
+
+@njit(cache=True)
+def _atr_fill(tr, length, out):
+    n = tr.shape[0]
+    if n < length:
+        return
+
+    # First ATR value = SMA of first 'length' TR values (Wilder original)
+    total = 0.0
+    for i in range(length):
+        total += tr[i]
+    prev_atr = total / length
+    out[length - 1] = prev_atr
+
+    # Wilder smoothing: ATR[i] = (ATR[i-1] * (length - 1) + TR[i]) / length
+    for i in range(length, n):
+        prev_atr = (prev_atr * (length - 1) + tr[i]) / length
+        out[i] = prev_atr
+
+
+@njit(cache=True)
+def _atr_matrix_kernel(tr, lengths):
+    out = np.full((lengths.shape[0], tr.shape[0]), np.nan)
+    for j in range(lengths.shape[0]):
+        _atr_fill(tr, lengths[j], out[j])
+    return out
+
+
+class IndicatorMatrix:
+    """
+    Matrix indikator (periods x bars) yang bisa diindex per period
+    seperti dict lama: matrix[13] -> ndarray EMA13 (view, tanpa copy)
+    """
+
+    def __init__(self, periods: Sequence[int], values: np.ndarray):
+        self.periods = np.asarray(periods, dtype=np.int64)
+        self.values = values
+        self._row = {int(p): i for i, p in enumerate(self.periods)}
+
+    def __getitem__(self, period: int) -> np.ndarray:
+        return self.values[self._row[int(period)]]
+
+    def __contains__(self, period) -> bool:
+        return int(period) in self._row
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def __iter__(self):
+        return iter(self._row)
+
+    def keys(self):
+        return self._row.keys()
+
+    def items(self):
+        return ((p, self.values[i]) for p, i in self._row.items())
+
+    def rows(self, periods: Sequence[int]) -> np.ndarray:
+        # ambil beberapa period sekaligus (fancy index -> copy)
+        return self.values[[self._row[int(p)] for p in periods]]
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
 
 
 class IndicatorService:
     @staticmethod
     def ema_series(
         prices: Sequence[float], period: int, use_ema_seed: bool = False
-    ) -> List[Optional[float]]:
+    ) -> np.ndarray:
+        """
+        EMA array-in / array-out
+        prices : close price series (list / Series / ndarray)
+        return : ndarray float64 (NaN sebelum cukup data)
+        """
 
-        prices = list(prices)
-        ema = [None] * len(prices)
-        k = 2 / (period + 1)
+        arr = _as_float_array(prices)
 
         # ===== MODE 1: Binance/TradingView =====
         # EMA seeded dari harga pertama
         if use_ema_seed:
-            ema[0] = prices[0]
-            for i in range(1, len(prices)):
-                ema[i] = prices[i] * k + ema[i - 1] * (1 - k)
-            return ema
+            return _ema_kernel(arr, period, True)
 
         # ===== MODE 2: EMA dengan SMA seed (kode lama kamu) =====
-        if len(prices) < period:
+        if arr.shape[0] < period:
             raise ValueError("Data kurang dari period")
 
-        sma = sum(prices[:period]) / period
-        ema[period - 1] = sma
+        return _ema_kernel(arr, period, False)
+
+    @staticmethod
+    def ema_matrix(
+        prices: Sequence[float], periods: Sequence[int], use_ema_seed: bool = False
+    ) -> IndicatorMatrix:
+        """
+        EMA banyak period dalam satu panggilan
+        return : IndicatorMatrix (periods x bars), baris identik dengan ema_series
+        """
+
+        arr = _as_float_array(prices)
+        periods = np.asarray(list(periods), dtype=np.int64)
 
-        for i in range(period, len(prices)):
-            ema[i] = prices[i] * k + ema[i - 1] * (1 - k)
+        if not use_ema_seed and periods.size and arr.shape[0] < periods.max():
+            raise ValueError("Data kurang dari period")
 
-        return ema
+        return IndicatorMatrix(periods, _ema_matrix_kernel(arr, periods, use_ema_seed))
 
     @staticmethod
     def stochastic_series(
@@ -41,144 +322,148 @@ class IndicatorService:
         k_length: int = 14,
         k_smoothing: int = 3,
         d_smoothing: int = 3,
-    ) -> tuple[List[Optional[float]], List[Optional[float]]]:
-
-        closes = list(closes)
-        highs = list(highs)
-        lows = list(lows)
-        n = len(closes)
-
-        raw_k = [None] * n
-        smoothed_k = [None] * n
-        d_list = [None] * n
-
-        # Hitung raw %K
-        for i in range(k_length - 1, n):
-            low_min = min(lows[i - k_length + 1 : i + 1])
-            high_max = max(highs[i - k_length + 1 : i + 1])
-            raw_k[i] = (
-                100 * (closes[i] - low_min) / (high_max - low_min)
-                if high_max != low_min
-                else 0
-            )
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Stochastic %K / %D, O(n) (rolling min/max via monotonic deque)
+        return : (smoothed_k, d) ndarray float64 (NaN sebelum cukup data)
+        """
 
-        # Smooth %K
-        for i in range(k_length - 1 + k_smoothing - 1, n):
-            smoothed_k[i] = sum(raw_k[i - k_smoothing + 1 : i + 1]) / k_smoothing
+        closes = _as_float_array(closes)
+        highs = _as_float_array(highs)
+        lows = _as_float_array(lows)
 
-        # Hitung %D dari smoothed %K
-        for i in range(k_length - 1 + k_smoothing - 1 + d_smoothing - 1, n):
-            d_list[i] = sum(smoothed_k[i - d_smoothing + 1 : i + 1]) / d_smoothing
+        return _stochastic_kernel(
+            closes, highs, lows, k_length, k_smoothing, d_smoothing
+        )
 
-        return smoothed_k, d_list
+    @staticmethod
+    def rolling_min(values: Sequence[float], window: int) -> np.ndarray:
+        return _rolling_extrema_kernel(_as_float_array(values), window, False)
 
     @staticmethod
-    def rsi_series(prices: Sequence, period: int = 14) -> List[Optional[float]]:
-        prices = list(prices)
-        rsi: List[Optional[float]] = [None] * len(prices)
-        if len(prices) < period:
-            return rsi
-
-        gains = [0.0] * len(prices)
-        losses = [0.0] * len(prices)
-        for i in range(1, len(prices)):
-            delta = prices[i] - prices[i - 1]
-            gains[i] = max(delta, 0)
-            losses[i] = max(-delta, 0)
-
-        avg_gain = sum(gains[:period]) / period
-        avg_loss = sum(losses[:period]) / period
-        rsi[period] = 100 - (100 / (1 + avg_gain / avg_loss)) if avg_loss != 0 else 100
-
-        for i in range(period + 1, len(prices)):
-            avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-            avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-            rs = avg_gain / avg_loss if avg_loss != 0 else float("inf")
-            rsi[i] = 100 - (100 / (1 + rs))
-        return rsi
+    def rolling_max(values: Sequence[float], window: int) -> np.ndarray:
+        return _rolling_extrema_kernel(_as_float_array(values), window, True)
+
+    @staticmethod
+    def rsi_series(prices: Sequence, period: int = 14) -> np.ndarray:
+        """
+        Wilder RSI
+        return : ndarray float64 (NaN sampai index `period`),
+                 avg_loss == 0 -> RSI 100 (tanpa divide by zero)
+        """
+        return IndicatorService.rsi_matrix(prices, [period]).values[0]
+
+    @staticmethod
+    def rsi_matrix(prices: Sequence, periods: Sequence[int]) -> IndicatorMatrix:
+        """
+        RSI banyak period dalam satu panggilan (mis. range(2, 51))
+        return : IndicatorMatrix (periods x bars)
+        """
+
+        arr = _as_float_array(prices)
+        periods = np.asarray(list(periods), dtype=np.int64)
+
+        return IndicatorMatrix(periods, _rsi_matrix_kernel(arr, periods))
+
+    @staticmethod
+    def rolling_mean_std(
+        prices: Sequence[float], period: int = 20
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Rolling mean & population std-dev O(n)
+        return : (mean, std) ndarray float64 (NaN sebelum cukup data)
+        """
+        return _rolling_mean_std_kernel(_as_float_array(prices), period)
 
     @staticmethod
     def bollinger_bands_series(
-        prices: Sequence[float], period=20, std_dev=2
-    ) -> List[Optional[float]]:
-        prices = list(prices)
-        n = len(prices)
-        upper_band: List[Optional[float]] = [None] * n
-        lower_band: List[Optional[float]] = [None] * n
-
-        for i in range(period - 1, n):
-            window = prices[i - period + 1 : i + 1]
-            sma = sum(window) / period
-            variance = sum((p - sma) ** 2 for p in window) / period
-            std = variance**0.5
-            upper_band[i] = sma + std_dev * std
-            lower_band[i] = sma - std_dev * std
-
-        return upper_band, lower_band
+        prices: Sequence[float], period=20, std_dev: float | Sequence[float] = 2
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Bollinger Bands dari rolling mean/std O(n)
+        std_dev scalar   -> (upper, lower) shape (bars,)
+        std_dev sequence -> (upper, lower) shape (len(std_dev), bars),
+                            mean/std hanya dihitung sekali untuk semua multiplier
+        """
+
+        sma, std = IndicatorService.rolling_mean_std(prices, period)
+
+        if np.ndim(std_dev) == 0:
+            return sma + std_dev * std, sma - std_dev * std
+
+        mult = np.asarray(std_dev, dtype=np.float64)[:, None]
+        return sma + mult * std, sma - mult * std
 
     @staticmethod
     def macd_series(
         prices: Sequence[float], fast: int = 12, slow: int = 26, signal: int = 9
-    ) -> tuple[List[Optional[float]], List[Optional[float]], List[Optional[float]]]:
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
 
         # EMA Binance-style
         ema_fast = IndicatorService.ema_series(prices, fast, use_ema_seed=True)
         ema_slow = IndicatorService.ema_series(prices, slow, use_ema_seed=True)
 
-        macd = [ema_fast[i] - ema_slow[i] for i in range(len(prices))]
+        macd = ema_fast - ema_slow
 
         # Signal line (juga Binance EMA)
         signal_line = IndicatorService.ema_series(macd, signal, use_ema_seed=True)
 
-        histogram = [macd[i] - signal_line[i] for i in range(len(prices))]
+        histogram = macd - signal_line
 
         return macd, signal_line, histogram
 
+    @staticmethod
+    def true_range_series(
+        high: Sequence[float], low: Sequence[float], close: Sequence[float]
+    ) -> np.ndarray:
+        """
+        True Range vectorized
+        TR[0] = high - low, TR[i] = max(H-L, |H-C_prev|, |L-C_prev|)
+        """
+
+        high = _as_float_array(high)
+        low = _as_float_array(low)
+        close = _as_float_array(close)
+
+        tr = high - low
+        if tr.shape[0] > 1:
+            prev_close = close[:-1]
+            tr[1:] = np.maximum(
+                tr[1:],
+                np.maximum(np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close)),
+            )
+
+        return tr
+
     @staticmethod
     def atr_series(
-        prices: Sequence[Dict[str, float]], length: int = 14
-    ) -> List[Optional[float]]:
+        high: Sequence[float],
+        low: Sequence[float],
+        close: Sequence[float],
+        length: int = 14,
+    ) -> np.ndarray:
         """
-        Menghitung ATR dari sequence OHLC
-        prices: list of dict dengan key: high, low, close
-        return: list ATR (None sebelum cukup data)
+        Menghitung ATR (Wilder) dari array high / low / close
+        return: ndarray ATR float64 (NaN sebelum cukup data)
         """
+        return IndicatorService.atr_matrix(high, low, close, [length]).values[0]
 
-        n = len(prices)
-        if n == 0:
-            return []
+    @staticmethod
+    def atr_matrix(
+        high: Sequence[float],
+        low: Sequence[float],
+        close: Sequence[float],
+        lengths: Sequence[int],
+    ) -> IndicatorMatrix:
+        """
+        ATR banyak length sekaligus, TR hanya dihitung sekali
+        return : IndicatorMatrix (lengths x bars)
+        """
+
+        tr = IndicatorService.true_range_series(high, low, close)
+        lengths = np.asarray(list(lengths), dtype=np.int64)
 
-        # Helper: compute True Range for each bar
-        tr = [0.0] * n
-        prev_close = None
-        for i, p in enumerate(prices):
-            h = float(p["high"])
-            l = float(p["low"])
-            c = float(p["close"])
-            if prev_close is None:
-                tr[i] = h - l
-            else:
-                tr[i] = max(h - l, abs(h - prev_close), abs(l - prev_close))
-            prev_close = c
-
-        atr = [None] * n
-
-        # If not enough data to compute first ATR, return initial None's
-        if n < length:
-            return atr
-
-        # First ATR value = SMA of first 'length' TR values (Wilder original)
-        first_atr = sum(tr[0:length]) / float(length)
-        atr[length - 1] = first_atr
-
-        # Wilder smoothing: ATR[i] = (ATR[i-1] * (length - 1) + TR[i]) / length
-        prev_atr = first_atr
-        for i in range(length, n):
-            curr_atr = (prev_atr * (length - 1) + tr[i]) / length
-            atr[i] = curr_atr
-            prev_atr = curr_atr
-
-        return atr
+        return IndicatorMatrix(lengths, _atr_matrix_kernel(tr, lengths))
 
     @staticmethod
     def ma_series(series: Sequence[float], length: int = 20) -> List[Optional[float]]:
@@ -0,0 +1,206 @@
+import math
+
+from typing import Sequence
+
+
+class _IndicatorStream:
+    """
+    Base streaming indicator: update O(1) per bar + snapshot / restore state
+    Nilai identik dengan IndicatorService batch jika diberi bar yang sama
+    """
+
+    _fields: tuple = ()
+
+    def snapshot(self) -> dict:
+        return {f: getattr(self, f) for f in self._fields}
+
+    @classmethod
+    def restore(cls, state: dict):
+        obj = cls.__new__(cls)
+        for f in cls._fields:
+            setattr(obj, f, state[f])
+        return obj
+
+    @property
+    def ready(self) -> bool:
+        return not math.isnan(self.value)
+
+
+class EMAStream(_IndicatorStream):
+    _fields = ("period", "use_ema_seed", "k", "count", "total", "value")
+
+    def __init__(self, period: int, use_ema_seed: bool = False):
+        self.period = period
+        self.use_ema_seed = use_ema_seed
+        self.k = 2 / (period + 1)
+        self.count = 0
+        self.total = 0.0
+        self.value = math.nan
+
+    def update(self, price: float) -> float:
+        price = float(price)
+        self.count += 1
+
+        # ===== MODE 1: seed dari harga pertama =====
+        if self.use_ema_seed:
+            if self.count == 1:
+                self.value = price
+            else:
+                self.value = price * self.k + self.value * (1 - self.k)
+            return self.value
+
+        # ===== MODE 2: SMA seed =====
+        if self.count < self.period:
+            self.total += price
+        elif self.count == self.period:
+            self.total += price
+            self.value = self.total / self.period
+        else:
+            self.value = price * self.k + self.value * (1 - self.k)
+
+        return self.value
+
+
+class RSIStream(_IndicatorStream):
+    _fields = (
+        "period",
+        "count",
+        "prev_price",
+        "sum_gain",
+        "sum_loss",
+        "avg_gain",
+        "avg_loss",
+        "value",
+    )
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0
+        self.prev_price = math.nan
+        self.sum_gain = 0.0
+        self.sum_loss = 0.0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.value = math.nan
+
+    def update(self, price: float) -> float:
+        price = float(price)
+        i = self.count
+        self.count += 1
+
+        if i == 0:
+            self.prev_price = price
+            return self.value
+
+        delta = price - self.prev_price
+        self.prev_price = price
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if i < self.period:
+            # kumpulkan seed (sama seperti gains/losses[:period] di batch)
+            self.sum_gain += gain
+            self.sum_loss += loss
+            return self.value
+
+        if i == self.period:
+            self.avg_gain = self.sum_gain / self.period
+            self.avg_loss = self.sum_loss / self.period
+        else:
+            # Wilder smoothing
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+
+        self.value = (
+            100 - (100 / (1 + self.avg_gain / self.avg_loss))
+            if self.avg_loss != 0
+            else 100.0
+        )
+        return self.value
+
+
+class ATRStream(_IndicatorStream):
+    _fields = ("length", "count", "prev_close", "total", "value")
+
+    def __init__(self, length: int = 14):
+        self.length = length
+        self.count = 0
+        self.prev_close = math.nan
+        self.total = 0.0
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        high, low, close = float(high), float(low), float(close)
+
+        if self.count == 0:
+            tr = high - low
+        else:
+            tr = max(
+                high - low, abs(high - self.prev_close), abs(low - self.prev_close)
+            )
+
+        self.prev_close = close
+        self.count += 1
+
+        if self.count < self.length:
+            self.total += tr
+        elif self.count == self.length:
+            # First ATR value = SMA of first 'length' TR values
+            self.total += tr
+            self.value = self.total / self.length
+        else:
+            # Wilder smoothing
+            self.value = (self.value * (self.length - 1) + tr) / self.length
+
+        return self.value
+
+
+class MACDStream(_IndicatorStream):
+    """
+    MACD Binance-style (EMA seed harga pertama), sama dengan macd_series
+    """
+
+    _fields = ("fast", "slow", "signal", "macd", "signal_line", "histogram")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMAStream(fast, use_ema_seed=True)
+        self.slow = EMAStream(slow, use_ema_seed=True)
+        self.signal = EMAStream(signal, use_ema_seed=True)
+        self.macd = math.nan
+        self.signal_line = math.nan
+        self.histogram = math.nan
+
+    def update(self, price: float) -> tuple[float, float, float]:
+        self.macd = self.fast.update(price) - self.slow.update(price)
+        self.signal_line = self.signal.update(self.macd)
+        self.histogram = self.macd - self.signal_line
+        return self.macd, self.signal_line, self.histogram
+
+    @property
+    def value(self) -> float:
+        return self.macd
+
+    def snapshot(self) -> dict:
+        state = super().snapshot()
+        for f in ("fast", "slow", "signal"):
+            state[f] = state[f].snapshot()
+        return state
+
+    @classmethod
+    def restore(cls, state: dict):
+        state = dict(state)
+        for f in ("fast", "slow", "signal"):
+            state[f] = EMAStream.restore(state[f])
+        return super().restore(state)
+
+
+class IndicatorStreamService:
+    @staticmethod
+    def warmup(stream: _IndicatorStream, *series: Sequence[float]):
+        """
+        Isi state stream dari history (sekali saat bot start),
+        setelah itu cukup update() per kline close
+        """
+        for bar in zip(*series):
+            stream.update(*bar)
+        return stream
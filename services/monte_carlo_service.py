@@ -0,0 +1,253 @@
+import time
+import numpy as np
+import pandas as pd
+
+from numba import njit
+
+from services.data import DataService, ResultStoreService
+from services.ema_service import EMAService
+from services.backtest_service import BacktestService
+from services.signal_service import SignalService
+
+# ringkasan distribusi per kombinasi (1 baris per combo)
+MONTE_CARLO_DTYPE = np.dtype(
+    [
+        ("combo", np.int64),
+        ("total_trades", np.int64),
+        ("final_equity_mean", np.float64),
+        ("final_equity_p5", np.float64),
+        ("final_equity_p50", np.float64),
+        ("final_equity_p95", np.float64),
+        ("max_drawdown_p50", np.float64),
+        ("max_drawdown_p95", np.float64),
+        ("max_drawdown_max", np.float64),
+        ("risk_of_ruin", np.float64),
+    ]
+)
+
+
+@njit(cache=True)
+def _path_stats_kernel(pnl_nom, idx, capital, final_equity, max_drawdown, min_equity):
+    # 1 pass per path: equity = capital + cumsum(pnl_nom[idx[r]]), drawdown
+    # sama dengan _trade_metrics_kernel (peak mulai dari capital)
+    for r in range(idx.shape[0]):
+        cum = 0.0
+        equity = capital
+        peak = capital
+        lowest = capital
+        max_dd = 0.0
+
+        for j in range(idx.shape[1]):
+            cum += pnl_nom[idx[r, j]]
+            equity = capital + cum
+            if equity > peak:
+                peak = equity
+            dd = (peak - equity) / (peak if peak != 0 else 1.0) * 100
+            if dd > max_dd:
+                max_dd = dd
+            if equity < lowest:
+                lowest = equity
+
+        final_equity[r] = equity
+        max_drawdown[r] = max_dd
+        min_equity[r] = lowest
+
+
+@njit(cache=True)
+def _shuffle_kernel(u, idx):
+    # Fisher-Yates per baris, angka acak dari u (Generator numpy -> reproducible)
+    n = idx.shape[1]
+    for r in range(idx.shape[0]):
+        for j in range(n):
+            idx[r, j] = j
+        for j in range(n - 1, 0, -1):
+            k = int(u[r, j] * (j + 1))
+            tmp = idx[r, j]
+            idx[r, j] = idx[r, k]
+            idx[r, k] = tmp
+
+
+class MonteCarloService:
+    """
+    Monte Carlo robustness dari PnL nominal per trade
+    - bootstrap : trade diambil ulang acak (dengan pengembalian)
+    - shuffle   : urutan trade diacak (final equity tetap, drawdown berubah)
+    Index trade per path dibangkitkan per chunk sebagai matrix (paths x trades)
+    -> memory dibatasi max_bytes, bukan n_paths; equity / drawdown per path
+    dihitung kernel numba dalam satu pass (tanpa matrix equity sementara).
+    """
+
+    @staticmethod
+    def simulate(
+        pnl_nom,
+        capital: float = 1000,
+        n_paths: int = 10000,
+        method: str = "bootstrap",
+        ruin_pct: float = 50.0,
+        seed: int | None = None,
+        max_bytes: int = 16 * 1024**2,
+    ) -> dict:
+        """
+        ruin_pct : equity pernah turun >= ruin_pct % dari capital -> ruin
+        return   : final_equity & max_drawdown per path + risk_of_ruin
+        """
+        pnl_nom = np.asarray(pnl_nom, dtype=float)
+        rng = np.random.default_rng(seed)
+
+        final_equity = np.full(n_paths, float(capital))
+        max_drawdown = np.zeros(n_paths)
+        ruined = np.zeros(n_paths, dtype=bool)
+
+        n = pnl_nom.size
+        if n == 0:
+            return MonteCarloService._result(final_equity, max_drawdown, ruined)
+
+        if method not in ("bootstrap", "shuffle"):
+            raise ValueError(f"Method Monte Carlo tidak dikenal: {method}")
+
+        # per chunk: matrix index int32 (+ matrix uniform float64 untuk shuffle)
+        chunk = max(1, int(max_bytes // (12 * n)))
+        min_equity = np.empty(n_paths)
+
+        for start in range(0, n_paths, chunk):
+            rows = min(chunk, n_paths - start)
+            stop = start + rows
+
+            if method == "bootstrap":
+                idx = rng.integers(0, n, size=(rows, n), dtype=np.int32)
+            else:
+                idx = np.empty((rows, n), dtype=np.int32)
+                _shuffle_kernel(rng.random((rows, n)), idx)
+
+            _path_stats_kernel(
+                pnl_nom,
+                idx,
+                float(capital),
+                final_equity[start:stop],
+                max_drawdown[start:stop],
+                min_equity[start:stop],
+            )
+
+        ruined = min_equity <= capital * (1 - ruin_pct / 100)
+
+        return MonteCarloService._result(final_equity, max_drawdown, ruined)
+
+    @staticmethod
+    def simulate_many(
+        trades: list,
+        capital: float = 1000,
+        n_paths: int = 10000,
+        method: str = "bootstrap",
+        ruin_pct: float = 50.0,
+        seed: int | None = None,
+        max_bytes: int = 16 * 1024**2,
+    ) -> np.ndarray:
+        """
+        trades : list array pnl_nom (1 per kombinasi, mis. top-N dari sweep)
+        return : MONTE_CARLO_DTYPE, urutan sama dengan trades
+        seed per combo diturunkan dari seed utama -> hasil reproducible
+        """
+        seeds = np.random.SeedSequence(seed).spawn(len(trades))
+        out = np.zeros(len(trades), dtype=MONTE_CARLO_DTYPE)
+
+        for i, pnl_nom in enumerate(trades):
+            res = MonteCarloService.simulate(
+                pnl_nom,
+                capital,
+                n_paths,
+                method,
+                ruin_pct,
+                seed=seeds[i],
+                max_bytes=max_bytes,
+            )
+            fe5, fe50, fe95 = np.percentile(res["final_equity"], [5, 50, 95])
+            dd50, dd95 = np.percentile(res["max_drawdown"], [50, 95])
+            out[i] = (
+                i,
+                len(pnl_nom),
+                res["final_equity"].mean(),
+                fe5,
+                fe50,
+                fe95,
+                dd50,
+                dd95,
+                res["max_drawdown"].max(),
+                res["risk_of_ruin"],
+            )
+
+        return out
+
+    @staticmethod
+    def _result(final_equity, max_drawdown, ruined) -> dict:
+        return {
+            "final_equity": final_equity,
+            "max_drawdown": max_drawdown,
+            "risk_of_ruin": float(ruined.mean()),
+        }
+
+    # ================= ENTRY POINT =================
+    @staticmethod
+    def test_monte_carlo(
+        top: int = 50,
+        n_paths: int = 10000,
+        method: str = "bootstrap",
+        min_trades: int = 30,
+        seed: int | None = 42,
+    ):
+        """
+        Top-N pair dari hasil test_tuning (result store) -> Monte Carlo per pair
+        """
+        print(f"\nUSE MONTE CARLO ({method}, {n_paths} paths, top {top})")
+        csv_file = "monte_carlo_results.csv"
+
+        capital = 1000.0
+        entry_alloc = capital * 0.1
+
+        total_start = time.perf_counter()
+
+        store = ResultStoreService("ema_tuning_1h_60")
+        if store.dtype is None:
+            raise ValueError(
+                f"Result store '{store.name}' kosong, "
+                "jalankan BacktestService.test_tuning dulu"
+            )
+
+        sweep = store.read(
+            ["ema_fast", "ema_slow", "profit_factor", "total_trades"],
+            filters={"total_trades": (min_trades, None)},
+        )
+        sweep = sweep[np.isfinite(sweep["profit_factor"])]
+        best = sweep[np.argsort(-sweep["profit_factor"], kind="stable")[:top]]
+
+        # PnL per trade pair terpilih (window train, sama dengan sweep)
+        matrix = EMAService.preload_ema(
+            np.unique(np.concatenate([best["ema_fast"], best["ema_slow"]]))
+        )
+        close = EMAService.get_close()
+        start, stop = DataService.get_bounds("train")
+
+        trades = []
+        for fast, slow in zip(best["ema_fast"], best["ema_slow"]):
+            signals = SignalService.cross_events(
+                matrix[fast][start:stop], matrix[slow][start:stop]
+            )
+            entry_idx, exit_idx = BacktestService.pair_signals(signals)
+            pnl_nom, _ = BacktestService.trade_pnl(
+                close[start:stop], entry_idx, exit_idx, entry_alloc
+            )
+            trades.append(pnl_nom)
+
+        results = MonteCarloService.simulate_many(
+            trades, capital, n_paths, method, seed=seed
+        )
+
+        result_df = pd.DataFrame(results)
+        result_df.insert(1, "ema_fast", best["ema_fast"])
+        result_df.insert(2, "ema_slow", best["ema_slow"])
+        result_df.to_csv(csv_file, index=False)
+
+        total_elapsed = time.perf_counter() - total_start
+        print(result_df.head(10))
+        print(f"FINISHED {len(trades)} combos x {n_paths} paths in {total_elapsed:.2f} sec")
+
+        return result_df
@@ -0,0 +1,317 @@
+import math
+import time
+import itertools
+import numpy as np
+
+from services.data import DataService
+from services.ema_service import EMAService
+from services.sweep_service import SweepService
+from services.backtest_service import BacktestService
+
+
+class OptimizerService:
+    """
+    Pencarian parameter tanpa brute-force penuh, memakai kernel yang sama
+    dengan SweepService (kernel(inputs, grid_chunk, **params) -> metrics)
+    - successive_halving : semua kandidat dites di subset data murah (block
+      tersebar di seluruh window, bukan prefix), yang lemah dibuang, survivor
+      dites di data lebih panjang
+    - coarse_to_fine     : grid kasar (step besar) lalu refine di sekitar
+      kandidat terbaik sampai step 1
+    Keduanya melaporkan jumlah evaluasi yang dihemat vs exhaustive.
+    """
+
+    # ================= SCORE =================
+    @staticmethod
+    def trade_floor(min_trades: int = 30, min_floor: int = 5):
+        # trade minimal di subset sepanjang fraction: diskalakan, tapi >= min_floor
+        def floor(fraction: float = 1.0) -> float:
+            return max(min_floor, min_trades * fraction)
+
+        return floor
+
+    @staticmethod
+    def profit_factor_score(min_trades: int = 30, min_floor: int = 5):
+        """
+        score(metrics, fraction) -> float array (lebih besar = lebih baik)
+        PF dengan syarat trade minimal (lihat trade_floor)
+        pair tanpa loss (PF inf) / trade kurang -> -inf
+        """
+        floor = OptimizerService.trade_floor(min_trades, min_floor)
+
+        def score(metrics: np.ndarray, fraction: float = 1.0) -> np.ndarray:
+            pf = metrics["profit_factor"]
+            eligible = (metrics["total_trades"] >= floor(fraction)) & np.isfinite(pf)
+            return np.where(eligible, pf, -np.inf)
+
+        return score
+
+    # ================= SUBSET =================
+    @staticmethod
+    def spread_blocks(
+        start: int, stop: int, fraction: float, n_blocks: int = 4
+    ) -> np.ndarray:
+        """
+        Subset sepanjang fraction dari window [start, stop): window dibagi
+        n_blocks strata waktu, tiap strata diambil 1 block di tengahnya
+        -> semua periode / regime terwakili, bukan hanya awal window
+        return: [(lo, hi), ...], fraction >= 1 -> [(start, stop)]
+        """
+        if fraction >= 1:
+            return np.array([(start, stop)], dtype=np.int64)
+
+        edges = np.linspace(start, stop, n_blocks + 1).astype(np.int64)
+        width = edges[1:] - edges[:-1]
+        length = np.maximum(1, np.round(width * fraction).astype(np.int64))
+        lo = edges[:-1] + (width - length) // 2
+        return np.column_stack([lo, lo + length])
+
+    # ================= SUCCESSIVE HALVING =================
+    @staticmethod
+    def successive_halving(
+        kernel,
+        inputs: dict,
+        grid,
+        params_at,
+        eta: int = 3,
+        min_fraction: float = 1 / 27,
+        score=None,
+        floor=None,
+        workers: int | None = None,
+        chunk_size: int = 256,
+    ) -> dict:
+        """
+        params_at(fraction) -> params kernel untuk subset data sepanjang fraction
+        (mis. blocks dari spread_blocks)
+        rung: min_fraction, min_fraction*eta, ..., 1.0
+        tiap rung: kandidat dengan trade >= floor(fraction) dinilai, sisa 1/eta;
+        kandidat dengan trade kurang belum bisa dinilai -> ikut rung berikutnya
+        (pair lambat tidak kalah oleh PF dari 1-2 trade)
+        """
+        score = score or OptimizerService.profit_factor_score()
+        floor = floor or OptimizerService.trade_floor()
+        survivors = np.asarray(grid)
+        n_total = len(survivors)
+
+        n_rungs = int(round(math.log(1 / min_fraction, eta))) + 1
+        fractions = [min(1.0, min_fraction * eta**r) for r in range(n_rungs)]
+        fractions[-1] = 1.0
+
+        evaluations = 0
+        cost = 0.0
+        rungs = []
+
+        for r, fraction in enumerate(fractions):
+            metrics = SweepService.run(
+                kernel,
+                inputs,
+                survivors,
+                params_at(fraction),
+                workers=workers,
+                chunk_size=chunk_size,
+            )
+            scores = score(metrics, fraction)
+            judged = metrics["total_trades"] >= floor(fraction)
+
+            evaluations += len(survivors)
+            cost += len(survivors) * fraction
+            rungs.append(
+                {
+                    "fraction": fraction,
+                    "candidates": len(survivors),
+                    "judged": int(judged.sum()),
+                }
+            )
+
+            if r == len(fractions) - 1:
+                break
+
+            # urutan grid dipertahankan supaya hasil deterministik
+            judged_idx = np.flatnonzero(judged)
+            keep = math.ceil(judged_idx.size / eta)
+            order = judged_idx[np.argsort(-scores[judged_idx], kind="stable")[:keep]]
+            carried = np.flatnonzero(~judged)
+            survivors = survivors[np.sort(np.concatenate([order, carried]))]
+
+        return OptimizerService._report(
+            metrics, scores, n_total, evaluations, cost, rungs=rungs
+        )
+
+    # ================= COARSE TO FINE =================
+    @staticmethod
+    def coarse_to_fine(
+        kernel,
+        inputs: dict,
+        bounds,
+        params: dict | None = None,
+        step: int = 8,
+        top_k: int = 10,
+        constraint=None,
+        score=None,
+        workers: int | None = None,
+        chunk_size: int = 256,
+    ) -> dict:
+        """
+        bounds     : [(lo, hi), ...] inklusif per parameter (integer)
+        constraint : fungsi(point) -> bool, mis. lambda p: p[0] < p[1]
+        tiap iterasi step dibagi 2, titik baru = tetangga ±step dari top_k
+        """
+        score = score or OptimizerService.profit_factor_score()
+        valid = constraint or (lambda point: True)
+
+        def clip(point):
+            return tuple(min(max(v, lo), hi) for v, (lo, hi) in zip(point, bounds))
+
+        seen = {}  # point -> (score, metrics row)
+        evaluations = 0
+        steps = []
+
+        points = [
+            p
+            for p in itertools.product(*[range(lo, hi + 1, step) for lo, hi in bounds])
+            if valid(p)
+        ]
+
+        while True:
+            new = sorted({p for p in points if p not in seen and valid(p)})
+            if new:
+                metrics = SweepService.run(
+                    kernel,
+                    inputs,
+                    new,
+                    params,
+                    workers=workers,
+                    chunk_size=chunk_size,
+                )
+                for point, s, row in zip(new, score(metrics), metrics):
+                    seen[point] = (s, row)
+                evaluations += len(new)
+            steps.append({"step": step, "candidates": len(new)})
+
+            if step == 1:
+                break
+
+            ranked = sorted(seen, key=lambda p: seen[p][0], reverse=True)[:top_k]
+            step = max(1, step // 2)
+            points = {
+                clip(tuple(v + d * step for v, d in zip(p, offset)))
+                for p in ranked
+                for offset in itertools.product((-1, 0, 1), repeat=len(bounds))
+            }
+
+        n_total = sum(
+            1
+            for p in itertools.product(*[range(lo, hi + 1) for lo, hi in bounds])
+            if valid(p)
+        )
+
+        rows = list(seen.values())
+        metrics = np.array([row for _, row in rows])
+        scores = np.array([s for s, _ in rows])
+        return OptimizerService._report(
+            metrics, scores, n_total, evaluations, float(evaluations), steps=steps
+        )
+
+    # ================= INTERNAL =================
+    @staticmethod
+    def _report(metrics, scores, n_total, evaluations, cost, **history) -> dict:
+        i = int(np.argmax(scores))
+        return {
+            "best": metrics[i],
+            "best_score": float(scores[i]),  # score di data penuh
+            "evaluations": evaluations,
+            "full_cost": cost,  # evaluasi setara full data
+            "exhaustive": n_total,
+            "saved": n_total - cost,
+            "saved_pct": (1 - cost / n_total) * 100 if n_total else 0.0,
+            **history,
+        }
+
+    @staticmethod
+    def _print_report(report: dict, label: str):
+        best = report["best"]
+        print(
+            f"{label:<10} ema_fast={best['ema_fast']} ema_slow={best['ema_slow']} "
+            f"PF={best['profit_factor']:.4f} PnL%={best['pnl_percent']:.4f} "
+            f"score={report['best_score']:.4f} | {report['evaluations']} evals, "
+            f"full-data cost "
+            f"{report['full_cost']:.0f} / {report['exhaustive']} "
+            f"(saved {report['saved_pct']:.1f}%)"
+        )
+
+    # ================= ENTRY POINT =================
+    @staticmethod
+    def test_optimizer(
+        method: str = "halving", workers: int | None = None, compare: bool = True
+    ):
+        """
+        compare=True -> hasil method dibandingkan dengan method lain
+        (halving <-> coarse), selisih score terlihat di output
+        """
+        print(f"\nUSE EMA OPTIMIZER ({method})")
+
+        capital = 1000.0
+        entry_alloc = capital * 0.1
+
+        total_start = time.perf_counter()
+
+        matrix = EMAService.preload_ema(range(1, 101))
+        start, stop = DataService.get_bounds("train")
+        inputs = {
+            "close": EMAService.get_close(),
+            "ema": matrix.values,
+            "ema_periods": matrix.periods,
+        }
+
+        def params_at(fraction: float) -> dict:
+            # subset murah = block tersebar di seluruh window train
+            return {
+                "blocks": OptimizerService.spread_blocks(start, stop, fraction),
+                "capital": capital,
+                "entry_alloc": entry_alloc,
+            }
+
+        def halving() -> dict:
+            pairs = [(f, s) for f in range(1, 100) for s in range(f + 1, 101)]
+            return OptimizerService.successive_halving(
+                BacktestService.ema_blocks_kernel,
+                inputs,
+                pairs,
+                params_at,
+                workers=workers,
+            )
+
+        def coarse() -> dict:
+            return OptimizerService.coarse_to_fine(
+                BacktestService.ema_pair_kernel,
+                inputs,
+                bounds=[(1, 99), (2, 100)],
+                params={
+                    "start": start,
+                    "stop": stop,
+                    "capital": capital,
+                    "entry_alloc": entry_alloc,
+                },
+                constraint=lambda p: p[0] < p[1],
+                workers=workers,
+            )
+
+        methods = {"halving": halving, "coarse": coarse}
+        if method not in methods:
+            raise ValueError(f"Method optimizer tidak dikenal: {method}")
+
+        report = methods[method]()
+        OptimizerService._print_report(report, method)
+
+        if compare:
+            other = "coarse" if method == "halving" else "halving"
+            reference = methods[other]()
+            OptimizerService._print_report(reference, other)
+            report["reference"] = reference
+            report["score_gap"] = reference["best_score"] - report["best_score"]
+            print(f"SCORE GAP vs {other}: {report['score_gap']:+.4f}")
+
+        total_elapsed = time.perf_counter() - total_start
+        print(f"FINISHED in {total_elapsed:.2f} sec")
+
+        return report
@@ -10,6 +10,7 @@ from services.data.data_loader_service import DataLoaderService
 from services.indicator_service import IndicatorService
 from services.data.data_service import DataService
 from services.candlestick_service import CandlestickIndicator
+from services.exit_service import ExitService, EXIT_OPEN
 
 
 class StrategyService:
@@ -276,13 +277,9 @@ class StrategyService:
         df = StrategyService.df_1h.copy()
         closes = df["close"]
 
-        # Siapkan OHLC untuk ATR
-        prices = [
-            {"high": h, "low": l, "close": c}
-            for h, l, c in zip(df["high"], df["low"], df["close"])
-        ]
-
-        df["atr"] = IndicatorService.atr_series(prices, length=14)
+        df["atr"] = IndicatorService.atr_series(
+            df["high"], df["low"], closes, length=14
+        )
 
         # ==========================
         # MACD
@@ -360,12 +357,6 @@ class StrategyService:
         df = StrategyService.df_1h.copy()
         closes = df["close"]
 
-        # Siapkan OHLC untuk ATR
-        prices = [
-            {"high": h, "low": l, "close": c}
-            for h, l, c in zip(df["high"], df["low"], df["close"])
-        ]
-
         # ==========================
         # RSI / Stochastic Filter
         # ==========================
@@ -390,7 +381,9 @@ class StrategyService:
         # ==========================
         # ATR
         # ==========================
-        df["atr"] = IndicatorService.atr_series(prices, length=14)
+        df["atr"] = IndicatorService.atr_series(
+            df["high"], df["low"], closes, length=14
+        )
         atr = df["atr"]
         atr_sma = atr.rolling(14).mean()
         df["atr_ok"] = (atr > atr_sma) & atr.notna()
@@ -462,14 +455,16 @@ class StrategyService:
 
     @staticmethod
     def candlestick_entry():
-        df = DataService.get_df_1h()
+        df = DataService.get_df_1h(copy=False)
         df = CandlestickIndicator.bullish_marubozu(df)
         df = CandlestickIndicator.bullish_hammer(df)
         df = CandlestickIndicator.bullish_inverted_hammer(df)
         df = CandlestickIndicator.bullish_long_white(df)
 
         closes = df["close"]
-        df["rsi"] = IndicatorService.rsi_series(closes)
+        df["rsi"] = DataService.get_indicator(
+            "rsi_14", lambda: IndicatorService.rsi_series(closes)
+        )
 
         # print()
         # print(
@@ -489,7 +484,26 @@ class StrategyService:
         )
 
         # ==========================
-        # INIT STATE
+        # ENTRY: sinyal di bar sebelumnya (i - 1), entry di open bar i
+        # ==========================
+        setup = (df["buy_signal"] & (df["rsi"] < 50)).to_numpy()
+        entry_signal = np.zeros(len(df), dtype=bool)
+        entry_signal[1:] = setup[:-1]
+
+        tp_pct = 1.4
+
+        # ==========================
+        # EXIT: TP intrabar (high), posisi berikutnya setelah exit
+        # ==========================
+        trades = ExitService.run(
+            entry_signal, df["open"], df["high"], df["low"], tp_pct=tp_pct
+        )
+        entry_idx = trades["entry_idx"]
+        closed = trades["reason"] != EXIT_OPEN
+        exit_idx = trades["exit_idx"][closed]
+
+        # ==========================
+        # OUTPUT COLUMNS
         # ==========================
         df["buy"] = False
         df["sell"] = False
@@ -500,34 +514,14 @@ class StrategyService:
         df["candle_before"] = None
         df["rsi_before"] = None
 
-        tp_pct = 1.4
-        tp = 1 + (tp_pct / 100)
+        df.loc[entry_idx, "buy"] = True
+        df.loc[entry_idx, "buy_price"] = trades["entry_price"]
+        df.loc[entry_idx, "in_position"] = True
+        df.loc[entry_idx, "candle_before"] = df["candle"].to_numpy()[entry_idx - 1]
+        df.loc[entry_idx, "rsi_before"] = df["rsi"].to_numpy()[entry_idx - 1]
 
-        # ==========================
-        # STATEFUL LOOP
-        # ==========================
-        for i in range(1, len(df)):
-
-            # ---- ENTRY ----
-            if not df.at[i - 1, "in_position"]:
-                if df.at[i - 1, "buy_signal"] and df.at[i - 1, "rsi"] < 50:
-                    df.at[i, "buy"] = True
-                    df.at[i, "buy_price"] = df.at[i, "open"]
-                    df.at[i, "candle_before"] = df.at[i - 1, "candle"]  # <---
-                    df.at[i, "rsi_before"] = df.at[i - 1, "rsi"]  # <--- TAMBAHAN INTI
-                    df.at[i, "in_position"] = True
-
-            # ---- HOLD / EXIT ----
-            else:
-                df.at[i, "buy_price"] = df.at[i - 1, "buy_price"]
-                df.at[i, "in_position"] = True
-
-                # TP HIT
-                if df.at[i, "high"] >= df.at[i, "buy_price"] * tp:
-                    df.at[i, "sell"] = True
-                    df.at[i, "sell_price"] = df.at[i, "buy_price"] * tp
-                    df.at[i, "in_position"] = False
-                    df.at[i, "buy_price"] = None
+        df.loc[exit_idx, "sell"] = True
+        df.loc[exit_idx, "sell_price"] = trades["exit_price"][closed]
 
         # ==========================
         # RETURN SIGNALS ONLY
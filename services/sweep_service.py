@@ -0,0 +1,415 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+from services.data import SharedDataService
+
+
+# ===== STATE WORKER (diisi initializer, sekali per process) =====
+_worker_inputs = None
+
+
+def _init_worker(manifest: dict):
+    global _worker_inputs
+    _worker_inputs = SharedDataService.attach(manifest)
+
+
+def _run_chunk(kernel, params: dict, chunk: np.ndarray):
+    return kernel(_worker_inputs, chunk, **params)
+
+
+class SweepService:
+    """
+    Parallel parameter sweep
+    - kernel(inputs, grid_chunk, **params) -> structured array (1 baris per param)
+    - inputs (close, EMA matrix, ...) dipublish sekali ke shared memory,
+      worker attach read-only tanpa copy
+    - hasil chunk dikirim balik ke process utama sesuai urutan grid
+      (deterministik), on_chunk = single writer (CSV / store / leaderboard)
+    """
+
+    @staticmethod
+    def run(
+        kernel,
+        inputs: dict,
+        grid,
+        params: dict | None = None,
+        workers: int | None = None,
+        chunk_size: int = 256,
+        on_chunk=None,
+        collect: bool = True,
+    ):
+        grid = np.asarray(grid)
+
+        n_chunks = max(1, -(-len(grid) // chunk_size))
+        chunks = np.array_split(grid, n_chunks)
+
+        results = []
+        for out in SweepService._map_chunks(kernel, inputs, chunks, params, workers):
+            if on_chunk is not None:
+                on_chunk(out)
+            if collect:
+                results.append(out)
+
+        if not collect:
+            return None
+        return np.concatenate(results) if results else None
+
+    @staticmethod
+    def run_top(
+        kernel,
+        inputs: dict,
+        grid,
+        leaderboard,
+        params: dict | None = None,
+        workers: int | None = None,
+        chunk_size: int = 256,
+        store=None,
+    ):
+        """
+        Sweep tanpa menyimpan semua hasil: tiap chunk langsung masuk leaderboard
+        (top-K per metric), memory konstan berapapun ukuran grid
+        store: ResultStoreService (opsional) -> tabel penuh ditulis per chunk
+        return: leaderboard
+        """
+
+        def on_chunk(out):
+            leaderboard.update(out)
+            if store is not None:
+                store.append(out)
+
+        SweepService.run(
+            kernel,
+            inputs,
+            grid,
+            params,
+            workers=workers,
+            chunk_size=chunk_size,
+            on_chunk=on_chunk,
+            collect=False,
+        )
+        return leaderboard
+
+    @staticmethod
+    def run_job(job, kernel, inputs: dict, workers: int | None = None):
+        """
+        Jalankan SweepJob: chunk yang sudah selesai (manifest) di-skip,
+        tiap chunk selesai langsung di-checkpoint -> aman dari crash / Ctrl-C
+        return: hasil gabungan semua chunk (urutan grid)
+        """
+        pending = job.pending_chunks()
+        if pending:
+            print(f"[{job.name}] {len(pending)}/{job.n_chunks} chunk tersisa")
+
+        chunk_ids = iter([cid for cid, _ in pending])
+        chunks = [chunk for _, chunk in pending]
+
+        for out in SweepService._map_chunks(
+            kernel, inputs, chunks, job.params, workers
+        ):
+            job.record(next(chunk_ids), out)
+
+        return job.merge()
+
+    @staticmethod
+    def _map_chunks(kernel, inputs: dict, chunks, params: dict | None, workers):
+        params = params or {}
+        workers = workers or os.cpu_count() or 1
+
+        if not chunks:
+            return
+
+        # 1 worker -> jalan inline, tanpa pool / shared memory
+        if workers == 1:
+            for chunk in chunks:
+                yield kernel(inputs, chunk, **params)
+            return
+
+        manifest = SharedDataService.publish(inputs)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(manifest,),
+            ) as pool:
+                # map() yield sesuai urutan chunk walau selesai tidak berurutan
+                yield from pool.map(partial(_run_chunk, kernel, params), chunks)
+        finally:
+            SharedDataService.release(manifest["name"])
+
+    @staticmethod
+    def benchmark(
+        kernel,
+        inputs: dict,
+        grid,
+        params: dict | None = None,
+        worker_counts=(1, 2, 4, 8, 16, 32),
+        chunk_size: int = 256,
+    ) -> list[dict]:
+        """
+        Ukur speedup vs 1 worker, hasil tiap run juga dicek identik
+        """
+        report = []
+        baseline = None
+        reference = None
+
+        for workers in worker_counts:
+            start = time.perf_counter()
+            out = SweepService.run(
+                kernel, inputs, grid, params, workers=workers, chunk_size=chunk_size
+            )
+            elapsed = time.perf_counter() - start
+
+            if baseline is None:
+                baseline = elapsed
+                reference = out
+            elif not SweepService._same(out, reference):
+                raise ValueError(f"Hasil sweep berbeda dengan {workers} worker")
+
+            report.append(
+                {
+                    "workers": workers,
+                    "seconds": elapsed,
+                    "speedup": baseline / elapsed,
+                    "efficiency": baseline / elapsed / workers,
+                }
+            )
+            print(
+                f" workers={workers:>3}  {elapsed:8.2f}s  "
+                f"speedup x{baseline / elapsed:.2f}"
+            )
+
+        return report
+
+    @staticmethod
+    def _same(a: np.ndarray, b: np.ndarray) -> bool:
+        if a.shape != b.shape:
+            return False
+        for field in a.dtype.names:
+            equal_nan = a.dtype[field].kind == "f"
+            if not np.array_equal(a[field], b[field], equal_nan=equal_nan):
+                return False
+        return True
+
+
+class Leaderboard:
+    """
+    Top-K per metric yang di-update per chunk sweep (streaming)
+    - metrics : {kolom: "max" | "min"}, mis. {"profit_factor": "max",
+                "pnl_percent": "max", "max_drawdown": "min"}
+    - filters : {kolom: (min, max)} inklusif, None = tanpa batas (format sama
+                dengan ResultStoreService.read), mis. min trade / max drawdown
+    Yang disimpan hanya <= k baris per metric -> memory O(k), bukan O(grid).
+    Nilai metric NaN / inf tidak ikut ranking (mis. PF inf = tanpa loss).
+    Nilai sama -> urutan grid (hasil identik berapapun chunk / worker).
+    """
+
+    def __init__(self, metrics: dict, k: int = 5, filters: dict | None = None):
+        for col, order in metrics.items():
+            if order not in ("max", "min"):
+                raise ValueError(f"Urutan leaderboard '{col}' harus max / min: {order}")
+
+        self.metrics = dict(metrics)
+        self.k = k
+        self.filters = filters or {}
+        self.n_seen = 0
+        self.n_eligible = 0
+
+        self._top = {col: None for col in self.metrics}
+        self._seq = {col: np.empty(0, dtype=np.int64) for col in self.metrics}
+
+    def update(self, chunk: np.ndarray):
+        # seq = posisi baris di grid -> tie-break deterministik
+        seq = np.arange(self.n_seen, self.n_seen + len(chunk), dtype=np.int64)
+        self.n_seen += len(chunk)
+
+        mask = np.ones(len(chunk), dtype=bool)
+        for col, (lo, hi) in self.filters.items():
+            if lo is not None:
+                mask &= chunk[col] >= lo
+            if hi is not None:
+                mask &= chunk[col] <= hi
+
+        chunk, seq = chunk[mask], seq[mask]
+        self.n_eligible += len(chunk)
+
+        for col, order in self.metrics.items():
+            finite = np.isfinite(chunk[col])
+            rows, rows_seq = chunk[finite], seq[finite]
+            if self._top[col] is not None:
+                rows = np.concatenate([self._top[col], rows])
+                rows_seq = np.concatenate([self._seq[col], rows_seq])
+
+            key = -rows[col] if order == "max" else rows[col]
+            keep = np.arange(len(rows))
+            if len(rows) > self.k:
+                # partisi dulu (O(n)), baris yang sama dengan batas ke-k ikut
+                kth = np.partition(key, self.k - 1)[self.k - 1]
+                keep = np.flatnonzero(key <= kth)
+
+            keep = keep[np.lexsort((rows_seq[keep], key[keep]))][: self.k]
+            self._top[col], self._seq[col] = rows[keep], rows_seq[keep]
+
+    def result(self) -> dict:
+        # {metric: structured array terurut (terbaik dulu), <= k baris}
+        return {col: top for col, top in self._top.items() if top is not None}
+
+    def table(self) -> np.ndarray | None:
+        """
+        Semua leaderboard jadi 1 tabel: kolom metric + rank (mulai 1) + baris hasil
+        """
+        parts = []
+        for col, top in self.result().items():
+            out = np.empty(
+                len(top), dtype=[("metric", "U32"), ("rank", np.int64)] + top.dtype.descr
+            )
+            out["metric"] = col
+            out["rank"] = np.arange(1, len(top) + 1)
+            for field in top.dtype.names:
+                out[field] = top[field]
+            parts.append(out)
+
+        return np.concatenate(parts) if parts else None
+
+
+class SweepJob:
+    """
+    Sweep yang bisa di-resume
+    <root>/<name>/manifest.json  : dataset hash, grid hash, params, chunk selesai
+    <root>/<name>/chunk_XXXXX.npy: hasil per chunk (structured array)
+
+    Restart dengan grid / data / params yang sama -> chunk selesai di-skip.
+    Jika berbeda -> ValueError (pakai reset=True untuk mulai ulang).
+    """
+
+    _root = os.path.join("results", "jobs")
+
+    def __init__(
+        self,
+        name: str,
+        grid,
+        inputs: dict,
+        params: dict | None = None,
+        chunk_size: int = 256,
+        root: str | None = None,
+        reset: bool = False,
+    ):
+        self.name = name
+        self.grid = np.asarray(grid)
+        self.params = params or {}
+        self.chunk_size = chunk_size
+        self.path = os.path.join(root or SweepJob._root, name)
+        self.n_chunks = max(1, -(-len(self.grid) // chunk_size))
+
+        if reset:
+            shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
+
+        # json round-trip -> bisa dibandingkan langsung dengan manifest di disk
+        identity = json.loads(
+            json.dumps(
+                {
+                    "dataset_hash": SweepJob.hash_arrays(inputs),
+                    "grid_hash": SweepJob.hash_arrays({"grid": self.grid}),
+                    "grid_size": len(self.grid),
+                    "chunk_size": chunk_size,
+                    "params": self.params,
+                }
+            )
+        )
+
+        self.manifest = self._load_manifest()
+        if self.manifest is None:
+            now = time.time()
+            self.manifest = {
+                "name": name,
+                **identity,
+                "completed": [],
+                "finished": False,
+                "created_at": now,
+                "updated_at": now,
+            }
+            self._save_manifest()
+        elif any(self.manifest[k] != v for k, v in identity.items()):
+            raise ValueError(
+                f"Sweep job '{name}' sudah ada dengan data / grid / params berbeda "
+                f"({self.path}), pakai reset=True untuk mulai ulang"
+            )
+
+    # ================= STATE =================
+    def pending_chunks(self) -> list:
+        done = set(self.manifest["completed"])
+        chunks = np.array_split(self.grid, self.n_chunks)
+        return [(i, c) for i, c in enumerate(chunks) if i not in done]
+
+    def record(self, chunk_id: int, result: np.ndarray):
+        # simpan hasil dulu, baru tandai selesai di manifest (keduanya atomic)
+        SweepJob._atomic_save(self._chunk_file(chunk_id), result)
+
+        self.manifest["completed"] = sorted(
+            set(self.manifest["completed"]) | {chunk_id}
+        )
+        self.manifest["finished"] = len(self.manifest["completed"]) == self.n_chunks
+        self.manifest["updated_at"] = time.time()
+        self._save_manifest()
+
+    @property
+    def finished(self) -> bool:
+        return self.manifest["finished"]
+
+    def merge(self) -> np.ndarray | None:
+        parts = [np.load(self._chunk_file(i)) for i in self.manifest["completed"]]
+        return np.concatenate(parts) if parts else None
+
+    def write_csv(self, csv_file: str, to_frame):
+        """
+        Tulis hasil akhir sekali (overwrite, atomic) -> tidak ada baris duplikat
+        to_frame: structured array -> DataFrame
+        """
+        if not self.finished:
+            raise ValueError(f"Sweep job '{self.name}' belum selesai")
+
+        tmp = f"{csv_file}.{os.getpid()}.tmp"
+        to_frame(self.merge()).to_csv(tmp, index=False)
+        os.replace(tmp, csv_file)
+
+    # ================= INTERNAL =================
+    @staticmethod
+    def hash_arrays(arrays: dict) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        for key in sorted(arrays):
+            arr = np.ascontiguousarray(arrays[key])
+            h.update(f"{key}:{arr.dtype.str}:{arr.shape}".encode())
+            h.update(arr.tobytes())
+        return h.hexdigest()
+
+    def _chunk_file(self, chunk_id: int) -> str:
+        return os.path.join(self.path, f"chunk_{chunk_id:05d}.npy")
+
+    def _manifest_file(self) -> str:
+        return os.path.join(self.path, "manifest.json")
+
+    def _load_manifest(self) -> dict | None:
+        if not os.path.exists(self._manifest_file()):
+            return None
+        with open(self._manifest_file()) as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        tmp = f"{self._manifest_file()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, self._manifest_file())
+
+    @staticmethod
+    def _atomic_save(path: str, value: np.ndarray):
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, value)
+        os.replace(tmp, path)
@@ -0,0 +1,286 @@
+import time
+import numpy as np
+import pandas as pd
+
+from services.data import DataService, ResultStoreService
+from services.ema_service import EMAService
+from services.sweep_service import SweepService
+from services.indicator_service import IndicatorMatrix
+from services.backtest_service import BacktestService, METRICS_DTYPE
+
+_METRICS = METRICS_DTYPE.names[2:]
+
+# 1 baris per window: batas bar, pair terpilih, metrics train & test
+WFV_DTYPE = np.dtype(
+    [
+        ("window", np.int64),
+        ("train_start", np.int64),
+        ("train_stop", np.int64),
+        ("test_start", np.int64),
+        ("test_stop", np.int64),
+        ("ema_fast", np.int64),
+        ("ema_slow", np.int64),
+    ]
+    + [(f"train_{m}", METRICS_DTYPE[m]) for m in _METRICS]
+    + [(f"test_{m}", METRICS_DTYPE[m]) for m in _METRICS]
+)
+
+
+class WalkForwardService:
+    """
+    Walk-Forward Validation (planning.md bagian 2.2 & 15)
+    - tiap window: tuning semua pair di train -> pair terbaik dites di test
+    - window jalan paralel (SweepService), EMA matrix full dataset dihitung
+      sekali dan dipakai semua window via shared memory
+    """
+
+    # ================= WINDOW =================
+    @staticmethod
+    def year_windows(
+        train_years: int = 1, test_years: int = 1, anchored: bool = False
+    ) -> np.ndarray:
+        """
+        Window per tahun kalender (timezone data), mis. 2019 -> 2020
+        anchored=True -> train selalu mulai dari awal data
+        return: [(train_start, train_stop, test_start, test_stop)] index bar
+        """
+        open_time = DataService.df_1h["open_time"]
+        first, last = open_time.iloc[0].year, open_time.iloc[-1].year
+
+        def bar_at(year: int) -> int:
+            ts = pd.Timestamp(f"{year}-01-01", tz=open_time.dt.tz)
+            return int(open_time.searchsorted(ts, side="left"))
+
+        windows = []
+        for year in range(first + train_years, last + 1, test_years):
+            train_start = 0 if anchored else bar_at(year - train_years)
+            test_start = bar_at(year)
+            test_stop = bar_at(year + test_years)
+            if test_stop > test_start:
+                windows.append((train_start, test_start, test_start, test_stop))
+
+        return np.array(windows, dtype=np.int64).reshape(-1, 4)
+
+    @staticmethod
+    def rolling_windows(
+        train_bars: int,
+        test_bars: int,
+        step_bars: int | None = None,
+        anchored: bool = False,
+    ) -> np.ndarray:
+        # window berdasarkan jumlah bar, step default = test_bars (test tidak overlap)
+        n = len(DataService.df_1h)
+        step = step_bars or test_bars
+
+        windows = []
+        for test_start in range(train_bars, n, step):
+            train_start = 0 if anchored else test_start - train_bars
+            test_stop = min(test_start + test_bars, n)
+            windows.append((train_start, test_start, test_start, test_stop))
+
+        return np.array(windows, dtype=np.int64).reshape(-1, 4)
+
+    # ================= ENGINE =================
+    @staticmethod
+    def run(
+        windows,
+        pairs=None,
+        min_trades: int = 30,
+        capital: float = 1000,
+        entry_alloc: float = 100,
+        workers: int | None = None,
+    ) -> np.ndarray:
+        """
+        windows : output year_windows / rolling_windows
+        pairs   : kandidat (ema_fast, ema_slow), default semua pair 1..100
+        return  : structured array WFV_DTYPE, urutan sama dengan windows
+        """
+        if pairs is None:
+            pairs = [(f, s) for f in range(1, 100) for s in range(f + 1, 101)]
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+
+        matrix = EMAService.preload_ema(np.unique(pairs))
+        windows = np.asarray(windows, dtype=np.int64).reshape(-1, 4)
+        grid = np.column_stack([np.arange(len(windows)), windows])
+
+        inputs = {
+            "close": EMAService.get_close(),
+            "ema": matrix.values,
+            "ema_periods": matrix.periods,
+        }
+        params = {
+            "pairs": pairs,
+            "min_trades": min_trades,
+            "capital": capital,
+            "entry_alloc": entry_alloc,
+        }
+
+        # 1 window per chunk -> window dibagi rata ke worker
+        return SweepService.run(
+            WalkForwardService.window_kernel,
+            inputs,
+            grid,
+            params,
+            workers=min(workers or len(grid), len(grid)),
+            chunk_size=1,
+        )
+
+    @staticmethod
+    def window_kernel(
+        inputs: dict,
+        windows: np.ndarray,
+        pairs: np.ndarray,
+        min_trades: int,
+        capital: float,
+        entry_alloc: float,
+    ) -> np.ndarray:
+        ema = IndicatorMatrix(inputs["ema_periods"], inputs["ema"])
+        close = inputs["close"]
+
+        out = np.zeros(len(windows), dtype=WFV_DTYPE)
+        for j, (window, train_start, train_stop, test_start, test_stop) in enumerate(
+            windows
+        ):
+            train = BacktestService.compute_pnl_batch(
+                close, ema, pairs, train_start, train_stop, capital, entry_alloc
+            )
+            best = WalkForwardService.select_best(train, min_trades)
+            test = BacktestService.compute_pnl_batch(
+                close,
+                ema,
+                [(best["ema_fast"], best["ema_slow"])],
+                test_start,
+                test_stop,
+                capital,
+                entry_alloc,
+            )[0]
+
+            row = out[j]
+            row["window"] = window
+            row["train_start"], row["train_stop"] = train_start, train_stop
+            row["test_start"], row["test_stop"] = test_start, test_stop
+            row["ema_fast"], row["ema_slow"] = best["ema_fast"], best["ema_slow"]
+            for m in _METRICS:
+                row[f"train_{m}"] = best[m]
+                row[f"test_{m}"] = test[m]
+
+        return out
+
+    @staticmethod
+    def select_best(metrics: np.ndarray, min_trades: int = 30):
+        """
+        Seleksi pair (planning.md 4.3): PF tertinggi -> PnL% tertinggi -> DD terendah
+        pair dengan trade < min_trades / PF inf (tanpa loss) tidak ikut
+        """
+        eligible = (metrics["total_trades"] >= min_trades) & np.isfinite(
+            metrics["profit_factor"]
+        )
+        candidates = metrics[eligible] if eligible.any() else metrics
+
+        # lexsort: key terakhir = prioritas utama
+        order = np.lexsort(
+            (
+                candidates["max_drawdown"],
+                -candidates["pnl_percent"],
+                -np.nan_to_num(candidates["profit_factor"], nan=-np.inf),
+            )
+        )
+        return candidates[order[0]]
+
+    # ================= KRITERIA =================
+    @staticmethod
+    def check(
+        results: np.ndarray,
+        min_pf: float = 1.2,
+        min_windows: int = 2,
+        max_dd_growth: float = 30.0,
+        max_wr_drop: float = 15.0,
+    ) -> dict:
+        """
+        Kriteria lolos WFV:
+        - test PF > min_pf di >= min_windows window
+        - max drawdown test tidak naik > max_dd_growth % dari window sebelumnya
+        - win rate test tidak turun > max_wr_drop poin dari win rate train-nya
+        """
+        pf = results["test_profit_factor"]
+        dd = results["test_max_drawdown"]
+
+        pf_windows = int(np.sum(pf > min_pf))
+
+        prev, curr = dd[:-1], dd[1:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dd_growth = np.where(
+                prev > 0, (curr - prev) / prev * 100, np.where(curr > 0, np.inf, 0.0)
+            )
+
+        wr_drop = results["train_win_rate"] - results["test_win_rate"]
+
+        checks = {
+            "profit_factor": pf_windows >= min_windows,
+            "drawdown_growth": bool(np.all(dd_growth <= max_dd_growth)),
+            "win_rate_drop": bool(np.all(wr_drop <= max_wr_drop)),
+        }
+
+        return {
+            "passed": all(checks.values()),
+            "checks": checks,
+            "pf_windows": pf_windows,
+            "dd_growth": dd_growth.tolist(),
+            "wr_drop": wr_drop.tolist(),
+        }
+
+    # ================= ENTRY POINT =================
+    @staticmethod
+    def test_walk_forward(
+        anchored: bool = False, workers: int | None = None, min_trades: int = 30
+    ):
+        print("\nUSE WALK FORWARD VALIDATION")
+        csv_file = "walk_forward_results.csv"
+
+        capital = 1000.0
+        entry_alloc = capital * 0.1
+
+        if DataService.df_1h is None:
+            DataService.init()
+
+        total_start = time.perf_counter()
+
+        windows = WalkForwardService.year_windows(anchored=anchored)
+        results = WalkForwardService.run(
+            windows,
+            min_trades=min_trades,
+            capital=capital,
+            entry_alloc=entry_alloc,
+            workers=workers,
+        )
+
+        open_time = DataService.df_1h["open_time"]
+        result_df = pd.DataFrame(results)
+        for col in ("train_start", "test_start"):
+            result_df[col.replace("_start", "_from")] = open_time.iloc[
+                result_df[col]
+            ].reset_index(drop=True)
+        result_df.to_csv(csv_file, index=False)
+        ResultStoreService("walk_forward", reset=True).append(results)
+
+        report = WalkForwardService.check(results)
+
+        total_elapsed = time.perf_counter() - total_start
+        print(
+            result_df[
+                [
+                    "train_from",
+                    "test_from",
+                    "ema_fast",
+                    "ema_slow",
+                    "train_profit_factor",
+                    "test_profit_factor",
+                    "test_max_drawdown",
+                    "test_win_rate",
+                ]
+            ]
+        )
+        print(f"WFV passed: {report['passed']} {report['checks']}")
+        print(f"FINISHED {len(windows)} windows in {total_elapsed:.2f} sec")
+
+        return results, report
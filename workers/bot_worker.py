@@ -28,6 +28,7 @@ class BotWorker:
             await asyncio.sleep(0.5)
 
         logging.info("[Worker] Stopping...")
+        BotService.release_shared()
         logging.info("[Worker] Stopped cleanly...")
 
     def stop(self):